@@ -0,0 +1,295 @@
+# Adquisición en vivo: fuente -> hilo productor -> anillo -> lectores.
+#
+# AnilloMuestras es un búfer circular preasignado (canales, 2·capacidad) en el
+# que cada muestra se escribe dos veces, en i y en i + capacidad, igual que el
+# búfer duplicado de osciloscopio.py. Así cualquier tramo de hasta
+# 'capacidad' muestras es una rebanada contigua y los lectores (osciloscopio,
+# espectro deslizante) obtienen vistas sin copia. Hay un único escritor: el
+# contador 'escritas' solo se publica después de copiar el bloque, y en
+# CPython su asignación es atómica, así que no hace falta ningún cerrojo. Un
+# lector lento puede ver sobrescrita su vista; vigente() lo indica.
+#
+# Las fuentes entregan bloques (canales, n) con leer() y None al terminar:
+#   FuenteSintetica: formas de onda de motor_senales con fase continua.
+#   FuenteArchivo:   reproduce una captura_mmap.Captura a velocidad real.
+#   FuenteSocket:    recibe tramas de un dispositivo (o de EmisorSocket,
+#                    que lo simula) por TCP local.
+# Las fuentes con tiempo_real=True las marca el productor con el reloj; si se
+# atrasa más que la capacidad del anillo, las muestras se cuentan como
+# perdidas (sobrecarga) y se retoma el ritmo. FuenteSocket detecta las
+# pérdidas por los huecos en el número de secuencia de las tramas.
+
+import select
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+import analisis_streaming
+import motor_senales
+
+# Cabecera de cada trama por socket: primera muestra (uint64) y número de
+# muestras por canal (uint32); siguen las muestras float32 intercaladas
+CABECERA = struct.Struct("<QI")
+
+
+class AnilloMuestras:
+    def __init__(self, canales, capacidad, dtype=float):
+        self.canales = canales
+        self.capacidad = capacidad
+        self.buffer = np.zeros((canales, 2 * capacidad), dtype=dtype)
+        self.escritas = 0  # Total de muestras por canal publicadas
+
+    def escribir(self, bloque):
+        # Solo desde el hilo productor
+        bloque = np.asarray(bloque).reshape(self.canales, -1)
+        n = bloque.shape[1]
+        if n > self.capacidad:
+            bloque = bloque[:, -self.capacidad:]
+        m = bloque.shape[1]
+        posicion = (self.escritas + n - m) % self.capacidad
+        primero = min(m, self.capacidad - posicion)
+        for base in (posicion, posicion + self.capacidad):
+            self.buffer[:, base:base + primero] = bloque[:, :primero]
+        resto = m - primero
+        if resto:
+            for base in (0, self.capacidad):
+                self.buffer[:, base:base + resto] = bloque[:, primero:]
+        self.escritas += n
+
+    def ultima_ventana(self, n):
+        # Vista (canales, n) de las n muestras más recientes y el índice
+        # global de la muestra siguiente a la última
+        fin = self.escritas
+        n = min(n, fin, self.capacidad)
+        inicio = (fin - n) % self.capacidad
+        return self.buffer[:, inicio:inicio + n], fin
+
+    def leer_desde(self, posicion, maximo=None):
+        # Para lectores que necesitan todas las muestras: devuelve la vista
+        # desde 'posicion', la nueva posición y cuántas muestras se perdieron
+        # por sobrescritura desde la última lectura
+        fin = self.escritas
+        perdidas = max(fin - self.capacidad - posicion, 0)
+        posicion += perdidas
+        n = fin - posicion if maximo is None else min(fin - posicion, maximo)
+        inicio = posicion % self.capacidad
+        return self.buffer[:, inicio:inicio + n], posicion + n, perdidas
+
+    def vigente(self, fin, n):
+        # True si la vista de n muestras que terminaba en 'fin' no se ha
+        # sobrescrito todavía
+        return self.escritas - fin <= self.capacidad - n
+
+
+class FuenteSintetica:
+    tiempo_real = True
+
+    def __init__(self, configuraciones, frecuencia_muestreo, tam_bloque=8192, total=None):
+        # configuraciones: diccionarios con tipo, frecuencia (Hz) y amplitud
+        self.canales = len(configuraciones)
+        self.frecuencia_muestreo = frecuencia_muestreo
+        self.generadores = [analisis_streaming.generar_bloques(
+            c['tipo'], c['frecuencia'], c['amplitud'], frecuencia_muestreo, tam_bloque, total)
+            for c in configuraciones]
+        self.bloque = None
+
+    def leer(self):
+        bloques = [next(generador, None) for generador in self.generadores]
+        if any(b is None for b in bloques):
+            return None
+        if self.bloque is None or self.bloque.shape[1] != len(bloques[0]):
+            self.bloque = np.empty((self.canales, len(bloques[0])))
+        for fila, b in zip(self.bloque, bloques):
+            fila[:] = b
+        return self.bloque
+
+
+class FuenteArchivo:
+    tiempo_real = True
+
+    def __init__(self, captura, tam_bloque=8192, repetir=True):
+        self.captura = captura
+        self.canales = captura.canales
+        self.frecuencia_muestreo = captura.frecuencia_muestreo
+        self.tam_bloque = tam_bloque
+        self.repetir = repetir
+        self.bloques = captura.bloques(None, tam_bloque)
+
+    def leer(self):
+        bloque = next(self.bloques, None)
+        if bloque is None and self.repetir and self.captura.tramas:
+            self.bloques = self.captura.bloques(None, self.tam_bloque)
+            bloque = next(self.bloques, None)
+        return bloque
+
+
+class FuenteSocket:
+    tiempo_real = False  # El ritmo lo marca el emisor
+
+    def __init__(self, direccion, canales, frecuencia_muestreo, tiempo_espera=5.0):
+        self.canales = canales
+        self.frecuencia_muestreo = frecuencia_muestreo
+        self.conexion = socket.create_connection(direccion, timeout=tiempo_espera)
+        self.cabecera = bytearray(CABECERA.size)
+        self.datos = bytearray()
+        self.esperada = 0
+        self.perdidas = 0
+
+    def recibir(self, destino):
+        vista = memoryview(destino)
+        while len(vista):
+            leidos = self.conexion.recv_into(vista)
+            if leidos == 0:
+                return False
+            vista = vista[leidos:]
+        return True
+
+    def leer(self):
+        try:
+            if not self.recibir(self.cabecera):
+                return None
+            secuencia, n = CABECERA.unpack(self.cabecera)
+            tamano = n * self.canales * 4
+            if len(self.datos) < tamano:
+                self.datos = bytearray(tamano)
+            if not self.recibir(memoryview(self.datos)[:tamano]):
+                return None
+        except (OSError, socket.timeout):
+            return None
+        # Hueco en la secuencia: el emisor descartó tramas
+        self.perdidas += max(secuencia - self.esperada, 0)
+        self.esperada = secuencia + n
+        muestras = np.frombuffer(self.datos, dtype=np.float32, count=n * self.canales)
+        return muestras.reshape(n, self.canales).T
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+class EmisorSocket(threading.Thread):
+    # Simula un dispositivo: envía los bloques de una fuente a velocidad real
+    # al primer cliente que se conecte. Si el cliente no drena el socket a
+    # tiempo, la trama se descarta (y el receptor ve el hueco).
+    def __init__(self, fuente, direccion=("127.0.0.1", 0)):
+        super().__init__(daemon=True)
+        self.fuente = fuente
+        self.servidor = socket.create_server(direccion)
+        self.direccion = self.servidor.getsockname()
+        self.detenido = threading.Event()
+        self.descartadas = 0
+
+    def run(self):
+        conexion, _ = self.servidor.accept()
+        enviadas = 0
+        inicio = time.perf_counter()
+        try:
+            while not self.detenido.is_set():
+                bloque = self.fuente.leer()
+                if bloque is None:
+                    break
+                n = bloque.shape[1]
+                espera = inicio + (enviadas + n) / self.fuente.frecuencia_muestreo - time.perf_counter()
+                if espera > 0:
+                    self.detenido.wait(espera)
+                _, escribibles, _ = select.select([], [conexion], [], 0)
+                if escribibles:
+                    trama = np.ascontiguousarray(bloque.T, dtype=np.float32)
+                    conexion.sendall(CABECERA.pack(enviadas, n) + trama.tobytes())
+                else:
+                    self.descartadas += n
+                enviadas += n
+        except OSError:
+            pass
+        finally:
+            conexion.close()
+            self.servidor.close()
+
+    def detener(self):
+        self.detenido.set()
+
+
+class Productor(threading.Thread):
+    def __init__(self, fuente, anillo):
+        super().__init__(daemon=True)
+        if fuente.canales != anillo.canales:
+            raise ValueError("La fuente y el anillo tienen distinto número de canales")
+        self.fuente = fuente
+        self.anillo = anillo
+        self.detenido = threading.Event()
+        self.producidas = 0
+        self.sobrecargas = 0
+        self.perdidas_ritmo = 0
+        self.inicio = None
+        self.fin = None
+
+    def run(self):
+        frecuencia = self.fuente.frecuencia_muestreo
+        self.inicio = referencia = time.perf_counter()
+        programadas = 0  # Muestras según el reloj desde 'referencia'
+        while not self.detenido.is_set():
+            bloque = self.fuente.leer()
+            if bloque is None:
+                break
+            n = bloque.shape[1]
+            if self.fuente.tiempo_real:
+                # El bloque está "disponible" cuando el reloj alcanza su final
+                espera = referencia + (programadas + n) / frecuencia - time.perf_counter()
+                if espera > 0:
+                    self.detenido.wait(espera)
+                elif -espera * frecuencia > self.anillo.capacidad:
+                    # Atraso mayor que el anillo: esas muestras se habrían
+                    # perdido en un dispositivo real; se retoma el ritmo
+                    self.sobrecargas += 1
+                    self.perdidas_ritmo += int(-espera * frecuencia)
+                    referencia = time.perf_counter()
+                    programadas = 0
+                programadas += n
+            self.anillo.escribir(bloque)
+            self.producidas += n
+        self.fin = time.perf_counter()
+
+    def detener(self, esperar=True):
+        self.detenido.set()
+        if esperar and self.is_alive():
+            self.join()
+
+    def estadisticas(self):
+        final = self.fin if self.fin is not None else time.perf_counter()
+        transcurrido = final - self.inicio if self.inicio is not None else 0.0
+        perdidas = self.perdidas_ritmo + getattr(self.fuente, 'perdidas', 0)
+        return {
+            'producidas': self.producidas,
+            'perdidas': perdidas,
+            'sobrecargas': self.sobrecargas,
+            'tasa': self.producidas / transcurrido if transcurrido > 0 else 0.0,
+        }
+
+
+class EspectroDeslizante:
+    # Espectro de las tam_ventana muestras más recientes del anillo. La
+    # ventana, el eje y los búferes se reservan una vez; por llamada solo se
+    # multiplica la vista del anillo por la ventana y se transforma.
+    def __init__(self, anillo, tam_ventana, frecuencia_muestreo, ventana="hann"):
+        self.anillo = anillo
+        self.tam_ventana = min(tam_ventana, anillo.capacidad)
+        self.coeficientes = motor_senales.crear_ventana(ventana, self.tam_ventana)
+        self.escala = 2 / self.coeficientes.sum()
+        self.ponderada = np.empty((anillo.canales, self.tam_ventana))
+        self.salida = motor_senales.reservar_espectro(self.tam_ventana, anillo.canales)
+        self.frecuencias = motor_senales.eje_frecuencias(self.tam_ventana) * (
+            frecuencia_muestreo / self.tam_ventana)
+
+    def calcular(self):
+        # None mientras el anillo no tenga una ventana completa
+        vista, fin = self.anillo.ultima_ventana(self.tam_ventana)
+        if vista.shape[1] < self.tam_ventana:
+            return None
+        np.multiply(vista, self.coeficientes, out=self.ponderada)
+        espectro = motor_senales.calcular_espectro(self.ponderada, salida=self.salida)
+        espectro['magnitud'] *= self.escala  # Amplitud de pico de cada tono
+        espectro['frecuencias'] = self.frecuencias
+        espectro['fin'] = fin
+        return espectro
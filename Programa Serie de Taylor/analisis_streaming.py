@@ -0,0 +1,93 @@
+# Análisis por bloques (STFT) para señales más largas que la memoria.
+#
+# Los bloques pueden venir de cualquier iterable (un generador, un archivo
+# leído por partes, etc.). generar_bloques produce las mismas formas de onda
+# que motor_senales.generar_senal pero trozo a trozo, manteniendo la fase
+# continua entre bloques. stft consume los bloques, aplica la ventana con el
+# solapamiento pedido y entrega un espectro por trama con memoria acotada.
+
+import numpy as np
+
+import motor_senales
+
+
+def generar_bloques(tipo, frecuencia, amplitud, frecuencia_muestreo, tam_bloque,
+                    total=None):
+    # La fase se acumula en ciclos (módulo 1) para no perder precisión cuando
+    # el índice global de muestra crece mucho.
+    if tipo not in motor_senales.TIPOS_SENAL:
+        raise ValueError("Tipo de señal no válido")
+    paso = frecuencia / frecuencia_muestreo
+    indices = np.arange(tam_bloque)
+    ciclos_bloque = np.multiply(indices, paso)
+    fase = 0.0
+    emitidas = 0
+    while total is None or emitidas < total:
+        n = tam_bloque if total is None else min(tam_bloque, total - emitidas)
+        argumento = ciclos_bloque[:n] + fase
+        argumento *= 2 * np.pi
+        bloque = motor_senales.forma_onda(tipo, argumento)
+        bloque *= amplitud
+        yield bloque
+        fase = (fase + paso * n) % 1.0
+        emitidas += n
+
+
+def bloques_senal(tipo, frecuencia, muestras, amplitud, continua, tam_bloque):
+    # Equivalente por bloques de motor_senales.generar_senal
+    if continua:
+        frecuencia_muestreo = max(muestras - 1, 1)  # t = linspace(0, 1, muestras)
+    else:
+        frecuencia_muestreo = muestras
+    return generar_bloques(tipo, frecuencia, amplitud, frecuencia_muestreo,
+                           tam_bloque, total=muestras)
+
+
+def stft(bloques, tam_ventana, solapamiento=0.5, ventana="hann", modo="rfft",
+         frecuencia_muestreo=None):
+    # Entrega (indice_inicio, espectro) por trama. Los bloques pueden ser
+    # vectores o matrices (canales, n); en el segundo caso cada espectro tiene
+    # una fila por canal. Solo se conserva en memoria lo que falta para la
+    # siguiente trama. Sin frecuencia_muestreo el eje de frecuencias queda en
+    # índices de bin, como en motor_senales.calcular_espectro.
+    if not 0 <= solapamiento < 1:
+        raise ValueError("El solapamiento debe estar en [0, 1)")
+    salto = max(int(round(tam_ventana * (1 - solapamiento))), 1)
+    coeficientes = motor_senales.crear_ventana(ventana, tam_ventana)
+    frecuencias = motor_senales.eje_frecuencias(tam_ventana)
+    if frecuencia_muestreo is not None:
+        frecuencias = frecuencias * (frecuencia_muestreo / tam_ventana)
+
+    pendiente = None
+    inicio = 0  # índice global de la primera muestra en 'pendiente'
+    for bloque in bloques:
+        bloque = np.asarray(bloque, dtype=float)
+        if pendiente is None or pendiente.shape[-1] == 0:
+            # Copia propia: las fuentes (Programa.bloques, FuenteSintetica)
+            # reutilizan su búfer y el siguiente bloque lo sobrescribiría
+            pendiente = np.array(bloque, dtype=float)
+        else:
+            pendiente = np.concatenate([pendiente, bloque], axis=-1)
+
+        disponibles = pendiente.shape[-1]
+        if disponibles < tam_ventana:
+            continue
+        tramas = (disponibles - tam_ventana) // salto + 1
+
+        # Todas las tramas completas se transforman en una sola llamada
+        vistas = np.lib.stride_tricks.sliding_window_view(pendiente, tam_ventana, axis=-1)
+        vistas = vistas[..., :tramas * salto:salto, :]
+        if vistas.ndim == 3:
+            vistas = np.moveaxis(vistas, 1, 0)  # (tramas, canales, tam_ventana)
+        espectros = motor_senales.calcular_espectro(vistas * coeficientes, modo)
+        espectros['frecuencias'] = frecuencias
+
+        for k in range(tramas):
+            yield inicio + k * salto, {
+                clave: valores if clave == 'frecuencias' else valores[k]
+                for clave, valores in espectros.items()
+            }
+
+        consumidas = tramas * salto
+        pendiente = pendiente[..., consumidas:].copy()
+        inicio += consumidas
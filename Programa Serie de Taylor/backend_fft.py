@@ -0,0 +1,117 @@
+# Capa intercambiable para las transformadas del motor.
+#
+# "numpy" usa np.fft (un solo hilo). "scipy" usa scipy.fft, que admite
+# varios hilos con workers= y conserva en su propia caché los planes de los
+# tamaños usados recientemente, de modo que las transformadas repetidas del
+# mismo tamaño no se vuelven a planificar. Con longitud_rapida=True la
+# entrada se rellena con ceros hasta el siguiente tamaño 5-suave (2^a·3^b·5^c)
+# para no caer en transformadas de longitud prima, mucho más lentas.
+#
+# scipy se importa solo al crear un backend "scipy", para que el motor siga
+# cargando únicamente NumPy.
+#
+# La variable de entorno SENALES_FFT elige el backend de la interfaz y de
+# grafica_fourier.py con el formato nombre[:workers][:rapida], por ejemplo
+# "scipy:-1:rapida" (scipy con todos los núcleos y relleno a tamaños
+# rápidos). Sin ella se usa np.fft.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+
+BACKENDS = ("numpy", "scipy")
+
+
+@lru_cache(maxsize=256)
+def siguiente_5_suave(n):
+    # Menor 2^a·3^b·5^c >= n
+    if n <= 1:
+        return 1
+    mejor = 1 << (n - 1).bit_length()
+    potencia5 = 1
+    while potencia5 < mejor:
+        potencia35 = potencia5
+        while potencia35 < mejor:
+            # Menor potencia de dos que, multiplicada, alcanza n
+            cociente = -(-n // potencia35)
+            candidato = potencia35 * (1 << (cociente - 1).bit_length())
+            mejor = min(mejor, candidato)
+            potencia35 *= 3
+        potencia5 *= 5
+    return mejor
+
+
+class BackendFFT:
+    def __init__(self, nombre="numpy", workers=1, longitud_rapida=False):
+        if nombre not in BACKENDS:
+            raise ValueError("Backend de FFT no válido")
+        self.nombre = nombre
+        # workers=-1 usa todos los núcleos disponibles
+        self.workers = (os.cpu_count() or 1) if workers == -1 else workers
+        self.longitud_rapida = longitud_rapida
+        if nombre == "scipy":
+            import scipy.fft
+            self.modulo = scipy.fft
+        else:
+            self.modulo = np.fft
+
+    @property
+    def clave(self):
+        # Lo que cambia el resultado (no los hilos): para las claves de caché
+        return (self.nombre, self.longitud_rapida)
+
+    def longitud(self, muestras):
+        return siguiente_5_suave(muestras) if self.longitud_rapida else muestras
+
+    def rfft(self, x, n=None, axis=-1):
+        if n is None:
+            n = self.longitud(x.shape[axis])
+        if self.nombre == "scipy":
+            return self.modulo.rfft(x, n=n, axis=axis, workers=self.workers)
+        return self.modulo.rfft(x, n=n, axis=axis)
+
+    def fft(self, x, n=None, axis=-1):
+        if n is None:
+            n = self.longitud(x.shape[axis])
+        if self.nombre == "scipy":
+            return self.modulo.fft(x, n=n, axis=axis, workers=self.workers)
+        return self.modulo.fft(x, n=n, axis=axis)
+
+    def __repr__(self):
+        return "BackendFFT({0!r}, workers={1}, longitud_rapida={2})".format(
+            self.nombre, self.workers, self.longitud_rapida)
+
+
+def desde_texto(texto):
+    # "nombre[:workers][:rapida]" -> BackendFFT
+    partes = texto.strip().split(":")
+    workers = 1
+    longitud_rapida = False
+    for parte in partes[1:]:
+        if parte == "rapida":
+            longitud_rapida = True
+        else:
+            workers = int(parte)
+    return BackendFFT(partes[0], workers, longitud_rapida)
+
+
+@lru_cache(maxsize=None)
+def backend_entorno():
+    # Backend configurado con SENALES_FFT, o None (np.fft) si no está definida
+    texto = os.environ.get("SENALES_FFT", "")
+    return desde_texto(texto) if texto else None
+
+
+@lru_cache(maxsize=None)
+def backend_predeterminado(dtype):
+    # Backend para cuando el llamador no elige ninguno. np.fft transforma las
+    # señales float32 pasando por búferes complex128 (unas 5 veces la memoria
+    # de la salida), mientras que scipy.fft trabaja en complex64 de principio
+    # a fin; si scipy no está instalado se usa np.fft igualmente.
+    if np.dtype(dtype) == np.float32:
+        try:
+            return BackendFFT("scipy")
+        except ImportError:
+            pass
+    return None
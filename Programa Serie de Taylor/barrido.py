@@ -0,0 +1,279 @@
+# Barrido de parámetros por lotes, sin interfaz gráfica.
+#
+# Recorre la rejilla tipo × frecuencia × amplitud × muestras × continua,
+# reparte los bloques de configuraciones entre procesos y escribe una parte
+# .npz columnar por bloque en el directorio de salida. Las partes que ya
+# existen se omiten, de modo que un barrido interrumpido se puede retomar.
+# barrido.json guarda la huella de la rejilla, la división en bloques y las
+# opciones: si no coincide con la del barrido pedido, no se reutiliza nada
+# (el programa se niega, o con --reiniciar borra las partes anteriores).
+#
+# Ejemplo:
+#   python barrido.py --tipos seno cuadrada triangular --frecuencias 1:500:1000 \
+#       --amplitudes 0.5,1,2 --muestras 4096,65536 --procesos 32 --salida resultados
+#
+# Los resultados se leen con cargar_resultados(directorio).
+#
+# --verificar no escribe nada: calcula la rejilla con la FFT y con los
+# coeficientes exactos y termina con código 1 si el bin del pico difiere o
+# su magnitud se aparta más que --tolerancia. Con frecuencias enteras muy
+# por debajo de Nyquist ambos caminos coinciden (la rejilla por defecto
+# pasa); los coeficientes exactos no modelan el solapamiento de armónicos
+# por encima de Nyquist, que en la FFT se pliegan sobre el fundamental.
+
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import motor_senales
+import serie_fourier
+
+MANIFIESTO = "barrido.json"
+COLUMNAS = ('tipo', 'frecuencia', 'amplitud', 'muestras', 'continua',
+            'pico_frecuencia', 'pico_magnitud', 'thd', 'magnitud_bins')
+
+
+def parsear_valores(texto, tipo=float):
+    # "a:b:n" -> n valores equiespaciados entre a y b; "x,y,z" -> lista
+    if ":" in texto:
+        inicio, fin, cantidad = texto.split(":")
+        valores = np.linspace(float(inicio), float(fin), int(cantidad))
+        return [tipo(v) for v in valores]
+    return [tipo(v) for v in texto.split(",") if v.strip()]
+
+
+def construir_rejilla(tipos, frecuencias, amplitudes, muestras, continuas):
+    rejilla = [{'tipo': tipo, 'frecuencia': f, 'amplitud': a, 'muestras': n, 'continua': c}
+               for n, tipo, f, a, c in itertools.product(muestras, tipos, frecuencias,
+                                                         amplitudes, continuas)]
+    return rejilla
+
+
+def dividir_bloques(rejilla, tam_bloque, presupuesto_bytes):
+    # Cada bloque tiene un único número de muestras (el relleno cambiaría el
+    # espectro) y se limita para que el banco quepa en el presupuesto
+    bloques = []
+    for muestras, grupo in itertools.groupby(rejilla, key=lambda c: c['muestras']):
+        grupo = list(grupo)
+        por_bloque = max(1, min(tam_bloque, presupuesto_bytes // (muestras * 8 * 4)))
+        for inicio in range(0, len(grupo), por_bloque):
+            bloques.append(grupo[inicio:inicio + por_bloque])
+    return bloques
+
+
+def thd_numerico(magnitud, fundamental):
+    # magnitud: (canales, bins); fundamental: índice del bin de cada fila
+    canales, bins = magnitud.shape
+    armonicos = np.arange(2, max(bins // max(int(fundamental.min()), 1), 2) + 1)
+    indices = np.multiply.outer(fundamental, armonicos)
+    validos = (indices < bins) & (fundamental[:, np.newaxis] > 0)
+    valores = np.take_along_axis(magnitud, np.where(validos, indices, 0), axis=1)
+    potencia = np.where(validos, valores, 0) ** 2
+    base = magnitud[np.arange(canales), fundamental]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base > 0, np.sqrt(potencia.sum(axis=1)) / base, np.nan)
+
+
+def metricas_numericas(configs, bins):
+    # Solo se usa la magnitud; la fase no se calcula
+    _, espectro = motor_senales.analizar_banco(configs, productos=("magnitud",))
+    magnitud = espectro['magnitud']
+    frecuencias = espectro['frecuencias']
+    # Se ignora el bin de continua al buscar el pico
+    pico = np.argmax(magnitud[:, 1:], axis=1) + 1 if magnitud.shape[1] > 1 else np.zeros(len(configs), int)
+    filas = np.arange(len(configs))
+    return {
+        'pico_frecuencia': frecuencias[pico],
+        'pico_magnitud': magnitud[filas, pico],
+        'thd': thd_numerico(magnitud, pico),
+        'magnitud_bins': recortar_bins(magnitud, bins),
+    }
+
+
+def metricas_analiticas(configs, bins):
+    # Sin FFT: coeficientes exactos de serie_fourier. El pico se busca en el
+    # espectro predicho igual que en metricas_numericas, así que su
+    # magnitud es la del fundamental de cada forma de onda (4/π·A en la
+    # cuadrada, 8/π²·A en la triangular) y su bin tiene en cuenta la base
+    # continua
+    picos_f, picos_m, thds, magnitudes = [], [], [], []
+    for c in configs:
+        n_terminos = serie_fourier.terminos_nyquist(c['frecuencia'], c['muestras'])
+        espectro = serie_fourier.espectro_dft(c, n_terminos)
+        magnitud = espectro['magnitud']
+        pico = int(np.argmax(magnitud[1:])) + 1 if len(magnitud) > 1 else 0
+        picos_f.append(espectro['frecuencias'][pico])
+        picos_m.append(magnitud[pico])
+        thds.append(serie_fourier.thd(c['tipo'], n_terminos))
+        magnitudes.append(espectro['magnitud'])
+    return {
+        'pico_frecuencia': np.array(picos_f),
+        'pico_magnitud': np.array(picos_m),
+        'thd': np.array(thds),
+        'magnitud_bins': recortar_bins(np.array(magnitudes), bins),
+    }
+
+
+def comparar_modos(configs, tolerancia):
+    # Configuraciones en las que --analitico no coincide con la FFT
+    fallos = []
+    for bloque in dividir_bloques(configs, 256, 512 * 2 ** 20):
+        numerico = metricas_numericas(bloque, 1)
+        analitico = metricas_analiticas(bloque, 1)
+        error = (np.abs(analitico['pico_magnitud'] - numerico['pico_magnitud'])
+                 / np.maximum(numerico['pico_magnitud'], 1e-300))
+        distintos = ((analitico['pico_frecuencia'] != numerico['pico_frecuencia'])
+                     | (error > tolerancia))
+        fallos.extend((c, e) for c, e, d in zip(bloque, error, distintos) if d)
+    return fallos
+
+
+def recortar_bins(magnitud, bins):
+    salida = np.zeros((magnitud.shape[0], bins))
+    usados = min(bins, magnitud.shape[1])
+    salida[:, :usados] = magnitud[:, :usados]
+    return salida
+
+
+def procesar_bloque(indice, configs, directorio, bins, analitico):
+    ruta = os.path.join(directorio, "parte_{0:06d}.npz".format(indice))
+    if os.path.exists(ruta):
+        return indice, len(configs), True
+    metricas = (metricas_analiticas if analitico else metricas_numericas)(configs, bins)
+    columnas = {
+        'tipo': np.array([c['tipo'] for c in configs]),
+        'frecuencia': np.array([c['frecuencia'] for c in configs], dtype=float),
+        'amplitud': np.array([c['amplitud'] for c in configs], dtype=float),
+        'muestras': np.array([c['muestras'] for c in configs], dtype=np.int64),
+        'continua': np.array([c['continua'] for c in configs], dtype=bool),
+    }
+    columnas.update(metricas)
+    # Escritura atómica: una parte a medias nunca se toma por terminada
+    temporal = ruta + ".tmp.npz"
+    np.savez(temporal, **columnas)
+    os.replace(temporal, ruta)
+    return indice, len(configs), False
+
+
+def listar_partes(directorio):
+    partes = sorted(glob.glob(os.path.join(directorio, "parte_*.npz")))
+    return [p for p in partes if not p.endswith(".tmp.npz")]
+
+
+def cargar_resultados(directorio):
+    columnas = {columna: [] for columna in COLUMNAS}
+    for parte in listar_partes(directorio):
+        with np.load(parte) as datos:
+            for columna in COLUMNAS:
+                columnas[columna].append(datos[columna])
+    if not columnas[COLUMNAS[0]]:
+        return {}
+    return {columna: np.concatenate(valores) for columna, valores in columnas.items()}
+
+
+def huella(bloques, bins, analitico):
+    # Identifica el contenido de cada parte: configuraciones por bloque,
+    # bins guardados y tipo de métricas
+    resumen = hashlib.sha256(json.dumps({'bins': bins, 'analitico': analitico}).encode())
+    for bloque in bloques:
+        resumen.update(json.dumps(bloque, sort_keys=True).encode())
+        resumen.update(b"\n")
+    return resumen.hexdigest()
+
+
+def preparar_salida(directorio, firma, reiniciar):
+    # True si el directorio queda listo para este barrido; False si contiene
+    # partes de otro barrido y no se pidió reiniciar
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, MANIFIESTO)
+    anterior = None
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            anterior = json.load(archivo).get('huella')
+    partes = listar_partes(directorio)
+    if anterior != firma and (partes or anterior is not None):
+        if not reiniciar:
+            return False
+        for parte in partes:
+            os.remove(parte)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump({'huella': firma}, archivo)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de señales")
+    parser.add_argument("--tipos", nargs="+", default=list(motor_senales.TIPOS_SENAL),
+                        choices=motor_senales.TIPOS_SENAL)
+    parser.add_argument("--frecuencias", default="1:100:100",
+                        help="inicio:fin:cantidad o lista separada por comas")
+    parser.add_argument("--amplitudes", default="1")
+    parser.add_argument("--muestras", default="4096")
+    parser.add_argument("--continua", choices=("si", "no", "ambas"), default="si")
+    parser.add_argument("--bins", type=int, default=64,
+                        help="bins de magnitud guardados por configuración")
+    parser.add_argument("--analitico", action="store_true",
+                        help="usar los coeficientes exactos en lugar de la FFT")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bloque", type=int, default=256,
+                        help="configuraciones por tarea")
+    parser.add_argument("--memoria-mb", type=int, default=512,
+                        help="presupuesto de memoria por tarea")
+    parser.add_argument("--salida", default="resultados_barrido")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="borrar las partes de un barrido distinto en la salida")
+    parser.add_argument("--verificar", action="store_true",
+                        help="comparar --analitico con la FFT en la rejilla y salir")
+    parser.add_argument("--tolerancia", type=float, default=0.01,
+                        help="diferencia relativa admitida en la magnitud del pico")
+    args = parser.parse_args(argv)
+
+    continuas = {"si": [True], "no": [False], "ambas": [True, False]}[args.continua]
+    frecuencias = parsear_valores(args.frecuencias)
+    if args.analitico and min(frecuencias) <= 0:
+        parser.error("--analitico necesita frecuencias positivas")
+    rejilla = construir_rejilla(args.tipos, frecuencias,
+                                parsear_valores(args.amplitudes),
+                                parsear_valores(args.muestras, int), continuas)
+    if args.verificar:
+        fallos = comparar_modos(rejilla, args.tolerancia)
+        for config, error in fallos[:20]:
+            print("{0}: diferencia {1:.2%}".format(config, error))
+        print("{0} de {1} configuraciones difieren entre --analitico y la FFT".format(
+            len(fallos), len(rejilla)))
+        sys.exit(1 if fallos else 0)
+    bloques = dividir_bloques(rejilla, args.bloque, args.memoria_mb * 2 ** 20)
+    if not preparar_salida(args.salida, huella(bloques, args.bins, args.analitico),
+                           args.reiniciar):
+        parser.error("{0} contiene resultados de otro barrido (otra rejilla, bloques, "
+                     "--bins o --analitico); use otra --salida o --reiniciar".format(args.salida))
+    print("{0} configuraciones en {1} bloques, {2} procesos".format(
+        len(rejilla), len(bloques), args.procesos))
+
+    inicio = time.perf_counter()
+    hechas = 0
+    with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+        futuros = [ejecutor.submit(procesar_bloque, i, bloque, args.salida,
+                                   args.bins, args.analitico)
+                   for i, bloque in enumerate(bloques)]
+        for futuro in as_completed(futuros):
+            _, cantidad, _ = futuro.result()
+            hechas += cantidad
+            transcurrido = time.perf_counter() - inicio
+            print("\r{0}/{1} configuraciones ({2:.0f}/s)".format(
+                hechas, len(rejilla), hechas / max(transcurrido, 1e-9)),
+                end="", file=sys.stderr)
+    print(file=sys.stderr)
+    print("Resultados en {0}".format(os.path.abspath(args.salida)))
+
+
+if __name__ == "__main__":
+    main()
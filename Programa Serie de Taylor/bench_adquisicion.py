@@ -0,0 +1,69 @@
+# Benchmark: adquisición en vivo sostenida.
+#
+# Un productor llena el anillo a la frecuencia pedida mientras un lector, al
+# ritmo de una pantalla, toma la última ventana (osciloscopio) y calcula el
+# espectro deslizante. Se informa la tasa real por canal, las muestras
+# perdidas y las sobrecargas; con --socket los datos pasan además por un
+# EmisorSocket local, como si vinieran de un dispositivo.
+#
+# Uso: python bench_adquisicion.py [--frecuencia 1000000] [--canales 2] [--segundos 5] [--socket]
+
+import argparse
+import time
+
+import adquisicion
+import decimacion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de adquisición en vivo")
+    parser.add_argument("--frecuencia", type=float, default=1e6, help="muestras/s por canal")
+    parser.add_argument("--canales", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--bloque", type=int, default=8192)
+    parser.add_argument("--capacidad", type=int, default=1 << 20)
+    parser.add_argument("--ventana", type=int, default=65536)
+    parser.add_argument("--cuadros", type=float, default=30.0, help="lecturas por segundo")
+    parser.add_argument("--socket", action="store_true")
+    args = parser.parse_args()
+
+    configuraciones = [{'tipo': tipo, 'frecuencia': 1000.0 * (i + 1), 'amplitud': 1.0}
+                       for i, tipo in zip(range(args.canales), ["seno", "cuadrada", "triangular"] * args.canales)]
+    total = int(args.frecuencia * args.segundos)
+    fuente = adquisicion.FuenteSintetica(configuraciones, args.frecuencia, args.bloque, total)
+    emisor = None
+    if args.socket:
+        emisor = adquisicion.EmisorSocket(fuente)
+        emisor.start()
+        fuente = adquisicion.FuenteSocket(emisor.direccion, args.canales, args.frecuencia)
+
+    anillo = adquisicion.AnilloMuestras(args.canales, args.capacidad)
+    espectro = adquisicion.EspectroDeslizante(anillo, args.ventana, args.frecuencia)
+    productor = adquisicion.Productor(fuente, anillo)
+    productor.start()
+
+    lecturas = 0
+    tiempo_lectura = 0.0
+    while productor.is_alive():
+        t0 = time.perf_counter()
+        vista, _ = anillo.ultima_ventana(args.ventana)
+        decimacion.envolvente_minmax(vista, decimacion.tam_cubeta(vista.shape[1], 1000))
+        espectro.calcular()
+        tiempo_lectura += time.perf_counter() - t0
+        lecturas += 1
+        time.sleep(1 / args.cuadros)
+    productor.join()
+
+    estadisticas = productor.estadisticas()
+    print("Producidas:   {0} de {1} por canal".format(estadisticas['producidas'], total))
+    print("Tasa real:    {0:.3f} MS/s por canal".format(estadisticas['tasa'] / 1e6))
+    print("Perdidas:     {0} ({1} sobrecargas)".format(estadisticas['perdidas'],
+                                                       estadisticas['sobrecargas']))
+    if emisor is not None:
+        print("Descartadas por el emisor: {0}".format(emisor.descartadas))
+    print("Lecturas:     {0}, {1:.2f} ms por lectura (ventana + espectro)".format(
+        lecturas, 1e3 * tiempo_lectura / max(lecturas, 1)))
+
+
+if __name__ == "__main__":
+    main()
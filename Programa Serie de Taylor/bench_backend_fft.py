@@ -0,0 +1,48 @@
+# Benchmark: rejilla de tamaños y número de hilos para los backends de FFT.
+#
+# Incluye tamaños "incómodos" (primos) para mostrar el efecto del relleno a
+# longitudes 5-suaves. Cada celda es el mejor tiempo de calcular_espectro
+# sobre una señal real; las llamadas repetidas del mismo tamaño aprovechan
+# los planes guardados por el backend.
+#
+# Uso: python bench_backend_fft.py [--tamanos ...] [--workers 1 2 4 -1]
+
+import argparse
+
+import numpy as np
+
+import backend_fft
+import motor_senales
+from medicion import mejor_tiempo
+
+TAMANOS = [65536, 65537, 100000, 999983, 1000000, 1048576, 1048573, 4194304, 4194301]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de backends de FFT")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, -1])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = [("numpy", backend_fft.BackendFFT("numpy"))]
+    for workers in args.workers:
+        backends.append(("scipy w={0}".format(workers),
+                         backend_fft.BackendFFT("scipy", workers=workers)))
+        backends.append(("scipy w={0} 5s".format(workers),
+                         backend_fft.BackendFFT("scipy", workers=workers, longitud_rapida=True)))
+
+    print("{0:>10s} {1:>10s}".format("muestras", "5-suave") +
+          "".join(" {0:>14s}".format(nombre) for nombre, _ in backends))
+    generador = np.random.default_rng(0)
+    for muestras in args.tamanos:
+        senal = generador.standard_normal(muestras)
+        fila = "{0:>10d} {1:>10d}".format(muestras, backend_fft.siguiente_5_suave(muestras))
+        for _, backend in backends:
+            fila += " {0:11.2f} ms".format(mejor_tiempo(
+                lambda: motor_senales.calcular_espectro(senal, backend=backend), args.repeticiones) * 1e3)
+        print(fila)
+
+
+if __name__ == "__main__":
+    main()
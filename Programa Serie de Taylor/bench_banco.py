@@ -0,0 +1,54 @@
+# Benchmark: banco de canales vectorizado frente a un bucle canal por canal.
+#
+# La ruta "bucle" reproduce el esquema original (generar_senal, np.pad y FFT
+# por canal); la ruta "banco" sintetiza y transforma todos los canales en una
+# sola llamada. Se informa el tiempo por canal para ver la escalabilidad.
+#
+# Uso: python bench_banco.py [--muestras N] [--canales 1 8 32 64]
+
+import argparse
+
+import numpy as np
+
+import motor_senales
+from medicion import mejor_tiempo
+
+
+def configuraciones(canales, muestras):
+    tipos = motor_senales.TIPOS_SENAL
+    return [{
+        'tipo': tipos[i % len(tipos)],
+        'frecuencia': 1.0 + i,
+        'amplitud': 1.0,
+        'muestras': muestras - (i % 4) * 10,
+        'continua': i % 2 == 0,
+    } for i in range(canales)]
+
+
+def ruta_bucle(configs):
+    senales = [motor_senales.generar_senal(**c)[1] for c in configs]
+    muestras = max(len(s) for s in senales)
+    senales = [np.pad(s, (0, muestras - len(s))) for s in senales]
+    return [motor_senales.calcular_espectro(s) for s in senales]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del banco de canales")
+    parser.add_argument("--muestras", type=int, default=100000)
+    parser.add_argument("--canales", type=int, nargs="+", default=[1, 2, 8, 32, 64])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print("{0:>8s} {1:>12s} {2:>12s} {3:>14s} {4:>14s}".format(
+        "canales", "bucle ms", "banco ms", "bucle ms/can", "banco ms/can"))
+    for canales in args.canales:
+        configs = configuraciones(canales, args.muestras)
+        t_bucle = mejor_tiempo(lambda: ruta_bucle(configs), args.repeticiones)
+        t_banco = mejor_tiempo(lambda: motor_senales.analizar_banco(configs), args.repeticiones)
+        print("{0:>8d} {1:12.2f} {2:12.2f} {3:14.3f} {4:14.3f}".format(
+            canales, t_bucle * 1e3, t_banco * 1e3,
+            t_bucle * 1e3 / canales, t_banco * 1e3 / canales))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Benchmark: grafo de señales compilado frente a NumPy directo.
+#
+# La misma señal de prueba (AM con ruido, más una FM, más una cuadrada) se
+# calcula con expresiones NumPy sobre el arreglo completo, que crean un
+# temporal del largo total por operación, y con grafo_senales compilado,
+# que evalúa por bloques reutilizando búferes. Se comparan tiempo, memoria
+# pico (tracemalloc) descontando el resultado, y la diferencia máxima.
+# Antes se comprueba que la reutilización de búferes no altera grafos con
+# entradas repetidas (Suma(a, 1, a), a·a·a, ...); si alguno falla el
+# programa termina con código 1.
+#
+# Uso: python bench_grafo.py [--tamanos 1000000 10000000] [--bloque 16384] [--float32]
+
+import argparse
+import sys
+
+import numpy as np
+
+import grafo_senales
+import motor_senales
+from medicion import cronometrar
+
+FRECUENCIA_MUESTREO = 1e6
+
+
+def numpy_directo(muestras, dtype):
+    t = np.arange(muestras) / FRECUENCIA_MUESTREO
+    portadora = np.sin(2 * np.pi * 100e3 * t)
+    moduladora = motor_senales.forma_onda("triangular", 2 * np.pi * 1e3 * t)
+    ruido = 0.01 * np.random.default_rng(1).standard_normal(muestras)
+    instantanea = 50e3 + 5e3 * np.sin(2 * np.pi * 300.0 * t)
+    ciclos = np.concatenate([[0.0], np.cumsum(instantanea[:-1])]) / FRECUENCIA_MUESTREO
+    senal = (portadora * (1 + 0.5 * moduladora) + ruido + 0.5 * np.sin(2 * np.pi * ciclos)
+             + 0.25 * motor_senales.forma_onda("cuadrada", 2 * np.pi * 7013.3 * t))
+    return senal.astype(dtype, copy=False)
+
+
+def grafo(muestras, dtype, tam_bloque):
+    senal = (grafo_senales.am(grafo_senales.Tono("seno", 100e3),
+                              grafo_senales.Tono("triangular", 1e3), 0.5)
+             + grafo_senales.Ruido(0.01, semilla=1)
+             + grafo_senales.FM(grafo_senales.Tono("seno", 300.0), 50e3, 5e3, amplitud=0.5)
+             + grafo_senales.Tono("cuadrada", 7013.3, 0.25))
+    programa = grafo_senales.compilar(senal, FRECUENCIA_MUESTREO, tam_bloque, dtype)
+    return programa.evaluar(muestras)
+
+
+def comprobar_entradas_repetidas(muestras=1000, tam_bloque=64):
+    # (nombre, nodo, función equivalente en NumPy sobre la señal a)
+    a = grafo_senales.Tono("triangular", 3.0)
+    b = grafo_senales.Tono("seno", 5.0)
+    casos = [
+        ("Suma(a, 1, a)", grafo_senales.Suma(a, grafo_senales.Constante(1), a),
+         lambda x, y: 2 * x + 1),
+        ("Suma(a, a)", grafo_senales.Suma(a, a), lambda x, y: 2 * x),
+        ("Producto(a, b, a)", grafo_senales.Producto(a, b, a), lambda x, y: x * y * x),
+        ("Suma(a, Producto(a, b), a)",
+         grafo_senales.Suma(a, grafo_senales.Producto(a, b), a), lambda x, y: 2 * x + x * y),
+    ]
+    x = grafo_senales.compilar(a, 100.0, tam_bloque).evaluar(muestras)
+    y = grafo_senales.compilar(b, 100.0, tam_bloque).evaluar(muestras)
+    fallos = []
+    for nombre, nodo, referencia in casos:
+        obtenido = grafo_senales.compilar(nodo, 100.0, tam_bloque).evaluar(muestras)
+        if not np.allclose(obtenido, referencia(x, y), rtol=0, atol=1e-12):
+            fallos.append(nombre)
+    return fallos
+
+
+def medir(funcion, *args):
+    resultado, tiempo, pico = cronometrar(funcion, *args)
+    return resultado, tiempo, pico - resultado.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del grafo de señales")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10 ** 6, 10 ** 7])
+    parser.add_argument("--bloque", type=int, default=grafo_senales.TAM_BLOQUE)
+    parser.add_argument("--float32", action="store_true")
+    args = parser.parse_args()
+    dtype = np.float32 if args.float32 else np.float64
+
+    fallos = comprobar_entradas_repetidas()
+    if fallos:
+        print("Resultados incorrectos con entradas repetidas: " + ", ".join(fallos))
+        sys.exit(1)
+
+    print("{0:>10s} {1:>12s} {2:>12s} {3:>13s} {4:>13s} {5:>10s}".format(
+        "muestras", "numpy ms", "grafo ms", "numpy MB", "grafo MB", "diferencia"))
+    for muestras in args.tamanos:
+        directo, t_directo, m_directo = medir(numpy_directo, muestras, dtype)
+        compilado, t_grafo, m_grafo = medir(grafo, muestras, dtype, args.bloque)
+        diferencia = np.abs(directo.astype(float) - compilado).max()
+        print("{0:10d} {1:12.1f} {2:12.1f} {3:13.1f} {4:13.1f} {5:10.1e}".format(
+            muestras, 1e3 * t_directo, 1e3 * t_grafo, m_directo / 2 ** 20, m_grafo / 2 ** 20,
+            diferencia))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Benchmark: motor sin interfaz frente a la ruta ligada a SignalGeneratorApp.
+#
+# Mide el tiempo de importación de cada módulo en un intérprete nuevo y la
+# latencia por llamada de la síntesis + FFT. La ruta "clase" reproduce el
+# código original de generate_plots: lee los parámetros de variables Tk,
+# sintetiza con scipy.signal y hace la FFT completa con ocho pasadas.
+#
+# Uso: python bench_motor.py [--repeticiones N]
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import motor_senales
+from medicion import mejor_tiempo
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def tiempo_importacion(modulo, repeticiones):
+    codigo = (
+        "import time; t0 = time.perf_counter(); import {0}; "
+        "print(time.perf_counter() - t0)"
+    ).format(modulo)
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=DIRECTORIO,
+                                capture_output=True, text=True, check=True)
+        tiempos.append(float(salida.stdout.strip()))
+    return min(tiempos)
+
+
+def ruta_clase(vars1, vars2):
+    from scipy.signal import square, sawtooth
+
+    def generar(vars_dict):
+        tipo = vars_dict['tipo'].get()
+        frecuencia = vars_dict['frecuencia'].get()
+        muestras = vars_dict['muestras'].get()
+        amplitud = vars_dict['amplitud'].get()
+        if vars_dict['continua'].get():
+            t = np.linspace(0, 1, muestras)
+            argumento = 2 * np.pi * frecuencia * t
+        else:
+            t = np.arange(muestras)
+            argumento = 2 * np.pi * frecuencia * t / muestras
+        if tipo == "seno":
+            return t, amplitud * np.sin(argumento)
+        elif tipo == "cuadrada":
+            return t, amplitud * square(argumento)
+        return t, amplitud * sawtooth(argumento, width=0.5)
+
+    _, senal1 = generar(vars1)
+    _, senal2 = generar(vars2)
+    muestras = max(len(senal1), len(senal2))
+    fft1 = np.fft.fft(senal1)
+    fft2 = np.fft.fft(senal2)
+    frecuencias = np.fft.fftfreq(muestras, d=1.0 / muestras)
+    productos = [np.abs(fft1), np.abs(fft2), np.real(fft1), np.real(fft2),
+                 np.imag(fft1), np.imag(fft2), np.angle(fft1), np.angle(fft2)]
+    return frecuencias[:muestras // 2], [p[:muestras // 2] for p in productos]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de señales")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Tiempo de importación (mejor de {0}):".format(args.repeticiones))
+    for modulo in ("motor_senales", "grafica_fourier_dft"):
+        try:
+            segundos = tiempo_importacion(modulo, args.repeticiones)
+            print("  {0:<22s} {1:8.1f} ms".format(modulo, segundos * 1e3))
+        except subprocess.CalledProcessError:
+            print("  {0:<22s} no disponible".format(modulo))
+
+    import tkinter as tk
+    interprete = tk.Tcl()  # Variables Tk sin abrir ventana
+
+    print("\nLatencia por llamada (2 canales, síntesis + espectro):")
+    print("  {0:>10s} {1:>12s} {2:>12s} {3:>8s}".format("muestras", "clase (ms)", "motor (ms)", "x"))
+    for muestras in (100, 10000, 100000, 1000000):
+        vars1 = {
+            'tipo': tk.StringVar(master=interprete, value="cuadrada"),
+            'frecuencia': tk.DoubleVar(master=interprete, value=5.0),
+            'amplitud': tk.DoubleVar(master=interprete, value=1.0),
+            'muestras': tk.IntVar(master=interprete, value=muestras),
+            'continua': tk.BooleanVar(master=interprete, value=True),
+        }
+        vars2 = dict(vars1, tipo=tk.StringVar(master=interprete, value="triangular"))
+        parametros1 = {clave: var.get() for clave, var in vars1.items()}
+        parametros2 = {clave: var.get() for clave, var in vars2.items()}
+
+        t_clase = mejor_tiempo(lambda: ruta_clase(vars1, vars2), args.repeticiones)
+        t_motor = mejor_tiempo(lambda: motor_senales.analizar_canales(parametros1, parametros2),
+                               args.repeticiones)
+        print("  {0:>10d} {1:12.3f} {2:12.3f} {3:8.2f}".format(
+            muestras, t_clase * 1e3, t_motor * 1e3, t_clase / t_motor))
+
+
+if __name__ == "__main__":
+    main()
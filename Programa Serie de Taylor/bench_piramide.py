@@ -0,0 +1,64 @@
+# Benchmark: zoom sobre el índice espectral frente a la longitud de captura.
+#
+# Para cada longitud se construye la PiramideEspectral de un tono con ruido
+# y se mide la consulta de una banda de ancho fijo (en bins) con el zoom de
+# banda limitada, la vista general de la pirámide y, como referencia, la
+# transformada chirp-z sobre toda la señal. El tiempo de zoom y de vista debe
+# mantenerse constante mientras el de la chirp-z crece con N; la última
+# columna es la diferencia máxima entre zoom y chirp-z (relativa al pico).
+#
+# Uso: python bench_piramide.py [--tamanos 100000 1000000 10000000] [--bins 200] [--puntos 2000]
+
+import argparse
+import time
+
+import numpy as np
+
+import piramide_espectral
+from medicion import mejor_tiempo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice espectral")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10 ** 5, 10 ** 6, 10 ** 7])
+    parser.add_argument("--bins", type=float, default=200.0, help="ancho de la banda en bins")
+    parser.add_argument("--puntos", type=int, default=2000)
+    parser.add_argument("--ancho-px", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    frecuencia_muestreo = 1e6
+    generador = np.random.default_rng(0)
+    print("{0:>10s} {1:>11s} {2:>10s} {3:>10s} {4:>11s} {5:>10s}".format(
+        "muestras", "índice ms", "zoom ms", "vista ms", "chirp-z ms", "error"))
+    for muestras in args.tamanos:
+        t = np.arange(muestras) / frecuencia_muestreo
+        senal = (np.sin(2 * np.pi * 123456.7 * t)
+                 + 1e-3 * generador.standard_normal(muestras))
+        t0 = time.perf_counter()
+        piramide = piramide_espectral.PiramideEspectral.desde_senal(senal, frecuencia_muestreo)
+        tiempo_indice = time.perf_counter() - t0
+
+        # Banda de ancho fijo en bins, centrada en el tono
+        mitad = args.bins * frecuencia_muestreo / muestras / 2
+        f0, f1 = 123456.7 - mitad, 123456.7 + mitad
+        tiempo_zoom = mejor_tiempo(lambda: piramide.zoom(f0, f1, args.puntos), args.repeticiones)
+        tiempo_vista = mejor_tiempo(lambda: piramide.vista(None, None, args.ancho_px),
+                                    args.repeticiones)
+
+        zoom = piramide.zoom(f0, f1, args.puntos)
+        frecuencias = zoom['frecuencias']
+        tiempo_czt = mejor_tiempo(lambda: piramide_espectral.zoom_czt(
+            senal, frecuencias[0], frecuencias[-1], len(frecuencias), frecuencia_muestreo),
+            max(args.repeticiones // 5, 1))
+        referencia = piramide_espectral.zoom_czt(senal, frecuencias[0], frecuencias[-1],
+                                                 len(frecuencias), frecuencia_muestreo)
+        error = (np.abs(zoom['magnitud'] - referencia['magnitud']).max()
+                 / referencia['magnitud'].max())
+        print("{0:10d} {1:11.1f} {2:10.3f} {3:10.3f} {4:11.1f} {5:10.1e}".format(
+            muestras, 1e3 * tiempo_indice, 1e3 * tiempo_zoom, 1e3 * tiempo_vista,
+            1e3 * tiempo_czt, error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Benchmark: precisión float32 frente a float64.
+#
+# Para cada tamaño analiza dos canales con analizar_canales en ambas
+# precisiones (y en float32 sin productos derivados, como la interfaz, que
+# deriva magnitud y fase por tramos al graficar)
+# y compara la memoria pico (tracemalloc, que ve las reservas de NumPy), el
+# tiempo y el error de la ruta float32 respecto de la float64:
+# error máximo de la señal relativo a la amplitud, error máximo del
+# espectro relativo a sum|x| (la escala natural del error de la FFT) y, por
+# separado, el error de la FFT complex64 sobre la misma señal float32.
+#
+# Uso: python bench_precision.py [--tamanos 1000000 10000000]
+
+import argparse
+
+import numpy as np
+
+import motor_senales
+from medicion import cronometrar
+
+
+def analizar(muestras, dtype, productos=motor_senales.PRODUCTOS):
+    parametros1 = {'tipo': 'cuadrada', 'frecuencia': 1234.5, 'amplitud': 2.0,
+                   'muestras': muestras, 'continua': True}
+    parametros2 = {'tipo': 'triangular', 'frecuencia': 777.0, 'amplitud': 1.0,
+                   'muestras': muestras, 'continua': False}
+    resultado, tiempo, pico = cronometrar(motor_senales.analizar_canales, parametros1,
+                                          parametros2, dtype=dtype, productos=productos)
+    return resultado, pico, tiempo, (parametros1['amplitud'], parametros2['amplitud'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de precisión float32")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10 ** 5, 10 ** 6, 10 ** 7])
+    args = parser.parse_args()
+
+    # Calentamiento: importaciones (scipy.fft) y cachés fuera de la medición
+    for dtype in (np.float64, np.float32):
+        analizar(1024, dtype)
+
+    print("{0:>10s} {1:>12s} {2:>12s} {3:>8s} {4:>12s} {5:>8s} {6:>10s} {7:>10s} {8:>12s} {9:>12s}".format(
+        "muestras", "pico f64", "pico f32", "ahorro", "f32 demanda", "ahorro", "t f64", "t f32",
+        "err señal", "err espectro") + " {0:>12s}".format("err FFT"))
+    for muestras in args.tamanos:
+        doble, pico64, tiempo64, amplitudes = analizar(muestras, np.float64)
+        simple, pico32, tiempo32, _ = analizar(muestras, np.float32)
+        _, pico_demanda, _, _ = analizar(muestras, np.float32, ())
+        error_senal = 0.0
+        error_espectro = 0.0
+        error_fft = 0.0
+        for canal, amplitud in zip((1, 2), amplitudes):
+            x64 = doble['senal{0}'.format(canal)]
+            x32 = simple['senal{0}'.format(canal)]
+            error_senal = max(error_senal, np.max(np.abs(x32 - x64)) / amplitud)
+            e64 = doble['espectro{0}'.format(canal)]
+            e32 = simple['espectro{0}'.format(canal)]
+            diferencia = np.hypot(e32['real'] - e64['real'], e32['imag'] - e64['imag'])
+            error_espectro = max(error_espectro, diferencia.max() / np.abs(x64).sum())
+            exacta = np.fft.rfft(x32.astype(np.float64))[:len(e32['real'])]
+            diferencia = np.hypot(e32['real'] - exacta.real, e32['imag'] - exacta.imag)
+            error_fft = max(error_fft, diferencia.max() / np.abs(x32).sum())
+        print("{0:>10d} {1:9.1f} MB {2:9.1f} MB {3:7.0f}% {4:9.1f} MB {5:7.0f}% "
+              "{6:7.1f} ms {7:7.1f} ms {8:12.2e} {9:12.2e}".format(
+                  muestras, pico64 / 2 ** 20, pico32 / 2 ** 20, 100 * (1 - pico32 / pico64),
+                  pico_demanda / 2 ** 20, 100 * (1 - pico_demanda / pico64),
+                  tiempo64 * 1e3, tiempo32 * 1e3, error_senal, error_espectro)
+              + " {0:12.2e}".format(error_fft))
+
+
+if __name__ == "__main__":
+    main()
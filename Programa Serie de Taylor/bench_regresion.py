@@ -0,0 +1,169 @@
+# Suite de regresión de rendimiento con referencias guardadas.
+#
+# Mide generar_senal para cada forma de onda, calcular_espectro y el
+# redibujo sin pantalla (PlantillaGraficas + Decimador sobre Agg) entre 10^3 y
+# 10^7 muestras. Cada caso se repite hasta acumular --tiempo-min segundos y
+# se compara su mejor tiempo con el guardado en el archivo de referencias:
+# si empeora más que --tolerancia el caso se marca como REGRESION y el
+# programa termina con código 1 (apto para CI). Sin archivo de referencias,
+# o con casos que no figuran en él, también termina con código 1 salvo que
+# se pase --guardar: un CI sin referencias no debe pasar en silencio.
+#
+# Uso:
+#   python bench_regresion.py --guardar        # registrar referencias
+#   python bench_regresion.py                  # comparar con ellas
+#   python bench_regresion.py --filtro espectro --tamanos 1000 100000 --desglose
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+import instrumentacion
+import motor_senales
+from medicion import medir
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+REFERENCIAS = os.path.join(DIRECTORIO, "referencias_bench.json")
+TAMANOS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+# Diferencias por debajo de este margen se consideran ruido de medición
+MARGEN_ABSOLUTO = 20e-6
+
+
+def parametros(tipo, muestras):
+    return {'tipo': tipo, 'frecuencia': 5.0, 'amplitud': 1.0, 'muestras': muestras,
+            'continua': True}
+
+
+def plantilla_agg():
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import decimacion
+    import graficas
+
+    figuras = [Figure(figsize=(10, 8)), Figure(figsize=(10, 6)), Figure(figsize=(10, 4))]
+    lienzos = [FigureCanvasAgg(fig) for fig in figuras]
+    plantilla = graficas.PlantillaGraficas(figuras[0], figuras[0].subplots(3, 1),
+                                           figuras[1], figuras[1].subplots(2, 1),
+                                           figuras[2], figuras[2].subplots())
+    return plantilla, decimacion.Decimador(), lienzos
+
+
+def casos(tamanos):
+    # Genera (nombre, función sin argumentos); la preparación queda fuera
+    # de la medición
+    for muestras in tamanos:
+        for tipo in motor_senales.TIPOS_SENAL:
+            yield ("generar_senal/{0}/{1}".format(tipo, muestras),
+                   lambda tipo=tipo, muestras=muestras:
+                   motor_senales.generar_senal(tipo, 5.0, muestras, 1.0, True))
+    for muestras in tamanos:
+        senal = motor_senales.generar_senal("cuadrada", 5.0, muestras, 1.0, True)[1]
+        salida = motor_senales.reservar_espectro(muestras)
+        yield ("espectro/{0}".format(muestras),
+               lambda senal=senal, salida=salida:
+               motor_senales.calcular_espectro(senal, salida=salida))
+    plantilla, decimador, lienzos = plantilla_agg()
+    for muestras in tamanos:
+        resultado = motor_senales.analizar_canales(parametros("seno", muestras),
+                                                   parametros("cuadrada", muestras))
+
+        def redibujo(resultado=resultado):
+            plantilla.actualizar(resultado, 2, decimador, histeresis=False)
+            for lienzo in lienzos[:2]:
+                with instrumentacion.tramo("dibujo"):
+                    lienzo.draw()
+        yield "redibujo/{0}".format(muestras), redibujo
+
+
+def descripcion_maquina():
+    return {'plataforma': platform.platform(), 'procesador': platform.processor(),
+            'python': platform.python_version(), 'numpy': np.__version__}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de regresión de rendimiento")
+    parser.add_argument("--referencias", default=REFERENCIAS)
+    parser.add_argument("--guardar", action="store_true",
+                        help="guardar los tiempos medidos como nuevas referencias")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="empeoramiento relativo admitido (0.25 = 25%%)")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--filtro", nargs="+", default=None,
+                        help="solo los casos cuyo nombre contenga alguno de estos textos")
+    parser.add_argument("--tiempo-min", type=float, default=0.5,
+                        help="segundos acumulados por caso")
+    parser.add_argument("--desglose", action="store_true",
+                        help="mostrar el tiempo por etapa (instrumentacion.py)")
+    args = parser.parse_args()
+
+    referencias = {'maquina': descripcion_maquina(), 'casos': {}}
+    if not os.path.exists(args.referencias) and not args.guardar:
+        print("No hay referencias en {0}; ejecute primero con --guardar".format(
+            args.referencias), file=sys.stderr)
+        sys.exit(1)
+    if os.path.exists(args.referencias):
+        with open(args.referencias, encoding="utf-8") as archivo:
+            referencias = json.load(archivo)
+        if not args.guardar and referencias.get('maquina') != descripcion_maquina():
+            print("Aviso: las referencias se tomaron en otra máquina o entorno",
+                  file=sys.stderr)
+    instrumentacion.trazador.activo = args.desglose
+
+    print("{0:<32s} {1:>12s} {2:>12s} {3:>9s}  {4}".format(
+        "caso", "referencia", "actual", "cambio", "estado"))
+    regresiones = []
+    nuevos = []
+    for nombre, funcion in casos(args.tamanos):
+        if args.filtro and not any(texto in nombre for texto in args.filtro):
+            continue
+        medicion = medir(funcion, args.tiempo_min)
+        actual = medicion['minimo']
+        referencia = referencias['casos'].get(nombre, {}).get('minimo')
+        if referencia is None:
+            estado, cambio = "NUEVO", ""
+            nuevos.append(nombre)
+        else:
+            cambio = "{0:+8.1f}%".format(100 * (actual / referencia - 1))
+            if actual > referencia * (1 + args.tolerancia) + MARGEN_ABSOLUTO:
+                estado = "REGRESION"
+                regresiones.append(nombre)
+            elif actual < referencia * (1 - args.tolerancia):
+                estado = "MEJORA"
+            else:
+                estado = "OK"
+        print("{0:<32s} {1:>12s} {2:9.3f} ms {3:>9s}  {4}".format(
+            nombre, "" if referencia is None else "{0:9.3f} ms".format(referencia * 1e3),
+            actual * 1e3, cambio, estado))
+        if args.guardar:
+            referencias['casos'][nombre] = medicion
+
+    if args.desglose:
+        print()
+        for etapa, datos in instrumentacion.trazador.resumen().items():
+            print("{0:<12s} {1:8d} llamadas {2:10.3f} ms de media {3:10.3f} ms máx.".format(
+                etapa, datos['llamadas'], datos['media_ms'], datos['maxima_ms']))
+
+    if args.guardar:
+        referencias['maquina'] = descripcion_maquina()
+        with open(args.referencias, "w", encoding="utf-8") as archivo:
+            json.dump(referencias, archivo, indent=2, sort_keys=True)
+        print("Referencias guardadas en {0}".format(args.referencias))
+    else:
+        if regresiones:
+            print("{0} regresiones: {1}".format(len(regresiones), ", ".join(regresiones)))
+        if nuevos:
+            print("{0} casos sin referencia (use --guardar): {1}".format(
+                len(nuevos), ", ".join(nuevos)))
+        if regresiones or nuevos:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
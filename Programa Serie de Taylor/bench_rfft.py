@@ -0,0 +1,45 @@
+# Benchmark: espectro con FFT compleja completa frente a la ruta rfft.
+#
+# Para cada tamaño mide el mejor tiempo de calcular_espectro en ambos modos y
+# la memoria pico asignada (tracemalloc registra los búferes de NumPy).
+#
+# Uso: python bench_rfft.py [--tamanos 1000000 10000000] [--repeticiones N]
+
+import argparse
+
+import motor_senales
+from medicion import cronometrar, mejor_tiempo
+
+
+def medir(senal, modo, repeticiones, salida=None):
+    mejor = mejor_tiempo(lambda: motor_senales.calcular_espectro(senal, modo, salida),
+                         repeticiones)
+    pico = cronometrar(motor_senales.calcular_espectro, senal, modo, salida)[2]
+    return mejor, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fft frente a rfft")
+    parser.add_argument("--tamanos", type=int, nargs="+",
+                        default=[10000, 100000, 1000000, 10000000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print("{0:>10s} {1:>10s} {2:>10s} {3:>10s} {4:>10s} {5:>10s} {6:>10s} {7:>7s} {8:>7s}".format(
+        "muestras", "fft ms", "rfft ms", "rfft* ms", "fft MiB", "rfft MiB", "rfft* MiB",
+        "tiempo", "memoria"))
+    for muestras in args.tamanos:
+        _, senal = motor_senales.generar_senal("cuadrada", 50.0, muestras, 1.0, True)
+        t_fft, m_fft = medir(senal, "fft", args.repeticiones)
+        t_rfft, m_rfft = medir(senal, "rfft", args.repeticiones)
+        # rfft*: con búferes de salida reservados una sola vez
+        salida = motor_senales.reservar_espectro(muestras)
+        t_reservado, m_reservado = medir(senal, "rfft", args.repeticiones, salida)
+        print("{0:>10d} {1:10.2f} {2:10.2f} {3:10.2f} {4:10.1f} {5:10.1f} {6:10.1f} {7:6.2f}x {8:6.2f}x".format(
+            muestras, t_fft * 1e3, t_rfft * 1e3, t_reservado * 1e3,
+            m_fft / 2 ** 20, m_rfft / 2 ** 20, m_reservado / 2 ** 20,
+            t_fft / t_rfft, m_fft / m_rfft))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Caché LRU de señales y espectros por canal.
+#
+# La clave es la tupla de parámetros de generar_senal, la longitud común a
+# la que se rellena el canal (el relleno cambia el espectro), la precisión
+# (float64 o float32) con los productos pedidos y el backend de FFT (con
+# longitud_rapida la transformada se rellena y el espectro es otro). Las entradas se desalojan
+# por antigüedad de uso cuando el total supera el presupuesto de memoria. Los
+# arreglos guardados quedan de solo lectura porque se comparten entre
+# resultados.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import motor_senales
+
+
+def clave_parametros(parametros, muestras, modo, dtype=np.float64,
+                     productos=motor_senales.PRODUCTOS, backend=None):
+    opciones = (muestras, modo, np.dtype(dtype).name, tuple(productos),
+                None if backend is None else backend.clave)
+    if parametros is None:
+        return (None,) + opciones
+    return (parametros['tipo'], float(parametros['frecuencia']), float(parametros['amplitud']),
+            int(parametros['muestras']), bool(parametros['continua'])) + opciones
+
+
+def tamano_entrada(senal, espectro):
+    # 'frecuencias' es compartido entre entradas del mismo tamaño
+    return senal.nbytes + sum(valores.nbytes for clave, valores in espectro.items()
+                              if clave != 'frecuencias')
+
+
+class CacheEspectros:
+    def __init__(self, presupuesto_bytes=256 * 2 ** 20, modo="rfft"):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.modo = modo
+        self.entradas = OrderedDict()
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.candado = threading.Lock()
+
+    def obtener(self, parametros, muestras, dtype=np.float64,
+                productos=motor_senales.PRODUCTOS, backend=None):
+        clave = clave_parametros(parametros, muestras, self.modo, dtype, productos, backend)
+        with self.candado:
+            entrada = self.entradas.get(clave)
+            if entrada is not None:
+                self.entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[0], entrada[1]
+            self.fallos += 1
+
+        # El cálculo se hace fuera del candado
+        senal, espectro = motor_senales.calcular_canal(parametros, muestras, self.modo,
+                                                     dtype, productos, backend)
+        for valores in (senal, *espectro.values()):
+            valores.flags.writeable = False
+        self.guardar(clave, senal, espectro)
+        return senal, espectro
+
+    def guardar(self, clave, senal, espectro):
+        tamano = tamano_entrada(senal, espectro)
+        if tamano > self.presupuesto_bytes:
+            return  # No cabe ni sola: no se guarda
+        with self.candado:
+            if clave in self.entradas:
+                return
+            self.entradas[clave] = (senal, espectro, tamano)
+            self.bytes_usados += tamano
+            while self.bytes_usados > self.presupuesto_bytes:
+                _, (_, _, liberado) = self.entradas.popitem(last=False)
+                self.bytes_usados -= liberado
+                self.desalojos += 1
+
+    def limpiar(self):
+        with self.candado:
+            self.entradas.clear()
+            self.bytes_usados = 0
+
+    def estadisticas(self):
+        with self.candado:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+                'entradas': len(self.entradas),
+                'bytes_usados': self.bytes_usados,
+                'presupuesto_bytes': self.presupuesto_bytes,
+            }
@@ -0,0 +1,134 @@
+# Lectura de capturas grandes mediante np.memmap.
+#
+# Abre archivos binarios crudos (int16/float32, canales intercalados) y WAV
+# sin cargarlos en memoria: los datos quedan mapeados como una matriz
+# (tramas, canales) y cada canal es una vista sin copia. Los bloques que se
+# entregan al motor de espectros se convierten a float de uno en uno, así que
+# la memoria residente no depende del tamaño del archivo.
+
+import os
+import struct
+
+import numpy as np
+
+import motor_senales
+import analisis_streaming
+
+# Factor para llevar enteros a [-1, 1)
+ESCALAS = {
+    np.dtype(np.int16): 1.0 / 32768,
+    np.dtype(np.int32): 1.0 / 2147483648,
+    np.dtype(np.float32): 1.0,
+    np.dtype(np.float64): 1.0,
+}
+
+
+class Captura:
+    def __init__(self, datos, frecuencia_muestreo, escala=None):
+        self.datos = datos  # memmap (tramas, canales)
+        self.frecuencia_muestreo = frecuencia_muestreo
+        self.escala = ESCALAS.get(datos.dtype, 1.0) if escala is None else escala
+
+    @property
+    def canales(self):
+        return self.datos.shape[1]
+
+    @property
+    def tramas(self):
+        return self.datos.shape[0]
+
+    def canal(self, indice):
+        # Vista con paso (sin copia) sobre el archivo mapeado
+        return self.datos[:, indice]
+
+    def leer(self, canal, inicio=0, muestras=None):
+        # Copia a float solo el tramo pedido
+        fin = self.tramas if muestras is None else min(inicio + muestras, self.tramas)
+        return self.convertir(self.datos[inicio:fin, canal])
+
+    def convertir(self, datos):
+        # Si el memmap ya es float64, asarray devuelve una vista de solo
+        # lectura: el escalado se hace siempre sobre un arreglo nuevo
+        if self.escala != 1.0:
+            return np.multiply(datos, self.escala, dtype=float)
+        return np.asarray(datos, dtype=float)
+
+    def bloques(self, canal=None, tam_bloque=65536, inicio=0, fin=None):
+        # canal=None entrega todos los canales como matrices (canales, n)
+        fin = self.tramas if fin is None else min(fin, self.tramas)
+        columnas = slice(None) if canal is None else canal
+        for desde in range(inicio, fin, tam_bloque):
+            bloque = self.convertir(self.datos[desde:min(desde + tam_bloque, fin), columnas])
+            yield bloque.T if canal is None else bloque
+
+    def espectro(self, canal, inicio=0, muestras=65536, modo="rfft"):
+        # Espectro de un tramo: solo se leen del disco las muestras usadas
+        return motor_senales.calcular_espectro(self.leer(canal, inicio, muestras), modo)
+
+    def stft(self, canal=None, tam_ventana=4096, solapamiento=0.5, ventana="hann",
+             tam_bloque=1 << 20):
+        return analisis_streaming.stft(self.bloques(canal, tam_bloque), tam_ventana,
+                                       solapamiento, ventana,
+                                       frecuencia_muestreo=self.frecuencia_muestreo)
+
+
+def abrir_raw(ruta, dtype=np.int16, canales=1, frecuencia_muestreo=1.0, desplazamiento=0):
+    dtype = np.dtype(dtype)
+    bytes_datos = os.path.getsize(ruta) - desplazamiento
+    tramas = bytes_datos // (dtype.itemsize * canales)
+    datos = np.memmap(ruta, dtype=dtype, mode="r", offset=desplazamiento,
+                      shape=(tramas, canales))
+    return Captura(datos, frecuencia_muestreo)
+
+
+def leer_cabecera_wav(ruta):
+    # Recorre los bloques RIFF hasta encontrar 'fmt ' y 'data'
+    with open(ruta, "rb") as archivo:
+        riff, _, wave = struct.unpack("<4sI4s", archivo.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError("El archivo no es WAV")
+        formato = None
+        while True:
+            cabecera = archivo.read(8)
+            if len(cabecera) < 8:
+                raise ValueError("WAV sin bloque de datos")
+            identificador, tamano = struct.unpack("<4sI", cabecera)
+            if identificador == b"fmt ":
+                contenido = archivo.read(tamano)
+                codigo, canales, frecuencia, _, _, bits = struct.unpack("<HHIIHH", contenido[:16])
+                if codigo == 0xFFFE and len(contenido) >= 26:  # WAVE_FORMAT_EXTENSIBLE
+                    codigo = struct.unpack("<H", contenido[24:26])[0]
+                formato = (codigo, canales, frecuencia, bits)
+                archivo.seek(tamano % 2, os.SEEK_CUR)
+            elif identificador == b"data":
+                if formato is None:
+                    raise ValueError("WAV sin bloque de formato")
+                desplazamiento = archivo.tell()
+                # Los WAV de más de 4 GB declaran 0xFFFFFFFF o el tamaño real
+                # módulo 2^32; en el segundo caso se suman los múltiplos de
+                # 2^32 que quepan en lo que queda del archivo
+                restante = os.path.getsize(ruta) - desplazamiento
+                if tamano == 0xFFFFFFFF or tamano > restante:
+                    tamano = restante
+                else:
+                    tamano += ((restante - tamano) >> 32) << 32
+                return formato, desplazamiento, tamano
+            else:
+                archivo.seek(tamano + tamano % 2, os.SEEK_CUR)
+
+
+def abrir_wav(ruta):
+    (codigo, canales, frecuencia, bits), desplazamiento, tamano = leer_cabecera_wav(ruta)
+    tipos = {
+        (1, 16): np.int16,
+        (1, 32): np.int32,
+        (3, 32): np.float32,
+        (3, 64): np.float64,
+    }
+    if (codigo, bits) not in tipos:
+        raise ValueError("Formato WAV no soportado")
+    dtype = np.dtype(tipos[(codigo, bits)])
+    tramas = tamano // (dtype.itemsize * canales)
+    datos = np.memmap(ruta, dtype=dtype, mode="r", offset=desplazamiento,
+                      shape=(tramas, canales))
+    return Captura(datos, frecuencia)
@@ -0,0 +1,142 @@
+# Reducción de datos a la resolución de pantalla.
+#
+# Una envolvente mín/máx por cubeta conserva los picos que un submuestreo
+# simple perdería: cada cubeta aporta dos puntos (mínimo y máximo) dibujados
+# sobre la misma x, de modo que la línea resultante cubre exactamente los
+# píxeles que cubriría la señal completa.
+
+import numpy as np
+
+# Muestras por bloque al calcular la envolvente (ver decimar)
+MUESTRAS_TRAMO = 1 << 16
+
+
+def tam_cubeta(muestras, ancho_px):
+    return max(-(-muestras // max(int(ancho_px), 1)), 1)
+
+
+def envolvente_minmax(y, cubeta):
+    # y: vector o matriz (canales, n). Devuelve los pares mín/máx intercalados
+    # sobre el último eje: [min0, max0, min1, max1, ...]. La última cubeta
+    # incompleta se rellena con su propio último valor.
+    y = np.asarray(y)
+    muestras = y.shape[-1]
+    cubetas = -(-muestras // cubeta)
+    faltan = cubetas * cubeta - muestras
+    if faltan:
+        relleno = np.repeat(y[..., -1:], faltan, axis=-1)
+        y = np.concatenate([y, relleno], axis=-1)
+    grupos = y.reshape(y.shape[:-1] + (cubetas, cubeta))
+    envolvente = np.empty(y.shape[:-1] + (cubetas, 2), dtype=y.dtype)
+    np.min(grupos, axis=-1, out=envolvente[..., 0])
+    np.max(grupos, axis=-1, out=envolvente[..., 1])
+    return envolvente.reshape(y.shape[:-1] + (2 * cubetas,))
+
+
+def buscar(x, valor, lado):
+    # searchsorted con el límite en la precisión del eje: un np.float64 (como
+    # los de get_xlim) sobre un eje float32 convertiría el eje entero
+    if x.dtype.kind == 'f':
+        valor = x.dtype.type(valor)
+    return int(np.searchsorted(x, valor, lado))
+
+
+def eje_envolvente(cubetas, cubeta, origen=0.0, paso=1.0):
+    # x de cada par mín/máx: el centro de su cubeta, repetido dos veces
+    centros = origen + paso * (np.arange(cubetas) * cubeta + (cubeta - 1) / 2)
+    return np.repeat(centros, 2)
+
+
+def decimar(x, y, ancho_px, x0=None, x1=None):
+    # Reduce (x, y) a lo visible en [x0, x1] con una envolvente mín/máx de
+    # unos ancho_px pares. x debe estar ordenado. Se conserva un punto a
+    # cada lado del rango para que la línea llegue hasta los bordes. La
+    # envolvente se calcula por bloques de cubetas enteras: las vistas con
+    # saltos (real/imag de la transformada) solo se copian de a un bloque y
+    # un producto diferido (motor_senales.ProductoDiferido) nunca se
+    # materializa entero.
+    inicio = 0 if x0 is None else max(buscar(x, x0, 'left') - 1, 0)
+    fin = len(x) if x1 is None else min(buscar(x, x1, 'right') + 1, len(x))
+    x_visible = x[inicio:fin]
+    muestras = len(x_visible)
+    if muestras <= 2 * max(int(ancho_px), 1):
+        return x_visible, y[inicio:fin]
+
+    cubeta = tam_cubeta(muestras, ancho_px)
+    cubetas = -(-muestras // cubeta)
+    # Cada par mín/máx va del primer al último x de su cubeta
+    primeros = np.arange(cubetas) * cubeta
+    ultimos = np.minimum(primeros + cubeta, muestras) - 1
+    eje = np.empty(2 * cubetas, dtype=np.result_type(x_visible, float))
+    eje[0::2] = x_visible[primeros]
+    eje[1::2] = x_visible[ultimos]
+    paso = max(MUESTRAS_TRAMO // cubeta, 1) * cubeta
+    return eje, np.concatenate([envolvente_minmax(y[a:min(a + paso, fin)], cubeta)
+                                for a in range(inicio, fin, paso)])
+
+
+class Decimador:
+    # Mantiene los datos completos de cada línea y vuelve a decimar lo
+    # visible cada vez que cambian los límites del eje (zoom/desplazamiento
+    # con NavigationToolbar2Tk) o el tamaño del lienzo. Las líneas de
+    # espectro pueden registrar además un zoom fino (piramide_espectral.py)
+    # que se usa cuando lo visible tiene menos bins que píxeles.
+    def __init__(self):
+        self.datos = {}
+        self.ejes = set()
+        self.zooms = {}  # línea -> [fábrica de la pirámide, pirámide o None]
+
+    def graficar(self, ax, x, y, *args, **kwargs):
+        x_dec, y_dec = decimar(x, y, ax.bbox.width)
+        linea, = ax.plot(x_dec, y_dec, *args, **kwargs)
+        self.registrar(linea, x, y)
+        return linea
+
+    def actualizar(self, linea, x, y):
+        # Nuevos datos para una línea existente, decimados sobre todo su rango
+        self.registrar(linea, x, y)
+        linea.set_data(*decimar(self.datos[linea][0], self.datos[linea][1],
+                                linea.axes.bbox.width))
+
+    def registrar(self, linea, x, y):
+        ax = linea.axes
+        self.datos[linea] = (np.asarray(x), y if getattr(y, 'por_tramos', False) else np.asarray(y))
+        self.zooms.pop(linea, None)
+        if ax not in self.ejes:
+            ax.callbacks.connect('xlim_changed', self.redecimar_eje)
+            self.ejes.add(ax)
+
+    def registrar_zoom(self, linea, fabrica):
+        # fabrica() -> PiramideEspectral de los datos actuales de la línea; se
+        # construye solo la primera vez que hace falta
+        self.zooms[linea] = [fabrica, None]
+
+    def redecimar_eje(self, ax):
+        x0, x1 = sorted(ax.get_xlim())
+        ancho = ax.bbox.width
+        for linea, (x, y) in self.datos.items():
+            if linea.axes is ax:
+                linea.set_data(*self.decimar_linea(linea, x, y, ancho, x0, x1))
+
+    def decimar_linea(self, linea, x, y, ancho, x0, x1):
+        # El zoom fino solo se usa si el eje muestra menos que todo el rango
+        # de los datos (zoom con la barra de herramientas): a vista completa
+        # se dibujan los bins tal cual
+        zoom = self.zooms.get(linea)
+        if zoom is not None and len(x) and (x0 > x[0] or x1 < x[-1]):
+            visibles = buscar(x, x1, 'right') - buscar(x, x0, 'left')
+            if 2 * visibles < ancho:
+                if zoom[1] is None:
+                    zoom[1] = zoom[0]()
+                return zoom[1].rango(x0, x1, ancho)
+        return decimar(x, y, ancho, x0, x1)
+
+    def redecimar_todo(self, evento=None):
+        for ax in list(self.ejes):
+            self.redecimar_eje(ax)
+
+    def limpiar(self):
+        # Olvida los datos completos; las conexiones de los ejes se mantienen
+        # porque los ejes ya no se limpian con ax.clear()
+        self.datos.clear()
+        self.zooms.clear()
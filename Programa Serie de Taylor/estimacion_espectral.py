@@ -0,0 +1,167 @@
+# Estimación espectral: ventanas, relleno con ceros, promediado de Welch y
+# detección de picos con interpolación parabólica.
+#
+# calcular_espectro transforma la señal tal cual (ventana rectangular), así
+# que un tono que no cae en un bin entero se dispersa por todo el espectro.
+# Aquí la señal se multiplica por una ventana, se rellena hasta
+# relleno·muestras para muestrear más fino el espectro y la magnitud se
+# normaliza por la ganancia coherente de la ventana, de modo que 'amplitud'
+# es directamente la amplitud de pico de cada tono. Todas las funciones
+# aceptan un vector o una matriz (canales, muestras) y operan por filas.
+#
+# Los ejes de frecuencia siguen la convención de motor_senales (ciclos por
+# señal) salvo que se indique frecuencia_muestreo.
+
+from functools import lru_cache
+
+import numpy as np
+
+import motor_senales
+
+# Elementos por lote al promediar segmentos de Welch
+ELEMENTOS_LOTE = 1 << 22
+
+
+@lru_cache(maxsize=32)
+def ventana_normalizada(nombre, longitud, beta=None):
+    # Coeficientes (solo lectura), ganancia coherente sum(w) y energía sum(w²)
+    coeficientes = motor_senales.crear_ventana(nombre, longitud, beta)
+    coeficientes.flags.writeable = False
+    return coeficientes, coeficientes.sum(), np.dot(coeficientes, coeficientes)
+
+
+def eje(muestras, longitud, frecuencia_muestreo=None):
+    frecuencias = motor_senales.eje_frecuencias(muestras, longitud)
+    if frecuencia_muestreo is not None:
+        frecuencias = frecuencias * (frecuencia_muestreo / muestras)
+    return frecuencias
+
+
+def estimar_espectro(senal, ventana="hann", relleno=1, beta=None,
+                     frecuencia_muestreo=None, backend=None):
+    # Espectro de un único segmento con ventana y relleno. 'magnitud' es |X|
+    # y 'amplitud' la magnitud corregida por la ganancia de la ventana.
+    senal = np.asarray(senal, dtype=float)
+    muestras = senal.shape[-1]
+    if relleno < 1:
+        raise ValueError("El factor de relleno debe ser >= 1")
+    coeficientes, ganancia, _ = ventana_normalizada(ventana, muestras, beta)
+    longitud = int(round(muestras * relleno))
+    if backend is not None:
+        longitud = backend.longitud(longitud)
+    mitad = longitud // 2
+    ponderada = senal * coeficientes
+    if backend is None:
+        transformada = np.fft.rfft(ponderada, n=longitud, axis=-1)[..., :mitad]
+    else:
+        transformada = backend.rfft(ponderada, n=longitud)[..., :mitad]
+    magnitud = np.abs(transformada)
+    amplitud = magnitud * (2 / ganancia)
+    amplitud[..., 0] /= 2  # La continua no se reparte entre dos mitades
+    return {
+        'frecuencias': eje(muestras, longitud, frecuencia_muestreo),
+        'magnitud': magnitud,
+        'amplitud': amplitud,
+        'fase': np.angle(transformada),
+    }
+
+
+def welch(senal, tam_segmento, solapamiento=0.5, ventana="hann", relleno=1,
+          beta=None, frecuencia_muestreo=None):
+    # Promedio de los periodogramas de segmentos solapados. Devuelve la
+    # densidad espectral de potencia de un lado y la amplitud RMS promediada
+    # por bin (corregida por la ventana, comparable con estimar_espectro).
+    # Sin frecuencia_muestreo el eje queda en ciclos por segmento. Los
+    # segmentos se transforman por lotes para acotar la memoria.
+    senal = np.asarray(senal, dtype=float)
+    muestras = senal.shape[-1]
+    if not 0 <= solapamiento < 1:
+        raise ValueError("El solapamiento debe estar en [0, 1)")
+    if tam_segmento > muestras:
+        raise ValueError("El segmento es más largo que la señal")
+    salto = max(int(round(tam_segmento * (1 - solapamiento))), 1)
+    coeficientes, ganancia, energia = ventana_normalizada(ventana, tam_segmento, beta)
+    longitud = int(round(tam_segmento * relleno))
+    mitad = longitud // 2
+
+    vistas = np.lib.stride_tricks.sliding_window_view(senal, tam_segmento, axis=-1)
+    vistas = vistas[..., ::salto, :]
+    segmentos = vistas.shape[-2]
+    canales = int(np.prod(senal.shape[:-1], dtype=int))
+    por_lote = max(ELEMENTOS_LOTE // (longitud * max(canales, 1)), 1)
+
+    acumulado = np.zeros(senal.shape[:-1] + (mitad,))
+    for inicio in range(0, segmentos, por_lote):
+        lote = vistas[..., inicio:inicio + por_lote, :] * coeficientes
+        transformada = np.fft.rfft(lote, n=longitud, axis=-1)[..., :mitad]
+        potencia = transformada.real ** 2
+        potencia += transformada.imag ** 2
+        acumulado += potencia.sum(axis=-2)
+    acumulado /= segmentos
+
+    escala_tiempo = tam_segmento if frecuencia_muestreo is None else frecuencia_muestreo
+    densidad = acumulado / (escala_tiempo * energia)
+    densidad[..., 1:] *= 2
+    amplitud = np.sqrt(acumulado) * (2 / ganancia)
+    amplitud[..., 0] /= 2
+    return {
+        'frecuencias': eje(tam_segmento, longitud, frecuencia_muestreo),
+        'densidad': densidad,
+        'amplitud': amplitud,
+        'segmentos': segmentos,
+    }
+
+
+def detectar_picos(espectro, frecuencias, n_picos=1, umbral=0.0):
+    # Los n_picos máximos locales más altos de cada fila, ordenados de mayor a
+    # menor y refinados con una parábola sobre el logaritmo de la magnitud
+    # (exacta para la ventana gaussiana y muy cercana para Hann y similares).
+    # Los huecos (filas con menos picos) quedan en NaN.
+    espectro = np.atleast_2d(np.asarray(espectro, dtype=float))
+    filas, bins = espectro.shape
+    n_picos = min(n_picos, max(bins - 2, 0))
+    forma = (filas, n_picos)
+    resultado = {'frecuencia': np.full(forma, np.nan),
+                 'amplitud': np.full(forma, np.nan),
+                 'bin': np.full(forma, -1)}
+    if n_picos == 0:
+        return resultado
+
+    centro = espectro[:, 1:-1]
+    maximos = (centro > espectro[:, :-2]) & (centro >= espectro[:, 2:]) & (centro > umbral)
+    candidatos = np.where(maximos, centro, -np.inf)
+    if n_picos < candidatos.shape[1]:
+        elegidos = np.argpartition(candidatos, -n_picos, axis=1)[:, -n_picos:]
+    else:
+        elegidos = np.broadcast_to(np.arange(candidatos.shape[1]), (filas, n_picos))
+    valores = np.take_along_axis(candidatos, elegidos, axis=1)
+    orden = np.argsort(-valores, axis=1)
+    elegidos = np.take_along_axis(elegidos, orden, axis=1) + 1
+    validos = np.isfinite(np.take_along_axis(valores, orden, axis=1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logaritmo = np.log(np.maximum(espectro, np.finfo(float).tiny))
+    alfa = np.take_along_axis(logaritmo, elegidos - 1, axis=1)
+    beta = np.take_along_axis(logaritmo, elegidos, axis=1)
+    gamma = np.take_along_axis(logaritmo, elegidos + 1, axis=1)
+    curvatura = alfa - 2 * beta + gamma
+    with np.errstate(divide='ignore', invalid='ignore'):
+        desplazamiento = np.where(curvatura < 0, 0.5 * (alfa - gamma) / curvatura, 0.0)
+    desplazamiento = np.clip(desplazamiento, -0.5, 0.5)
+    pico = np.exp(beta - 0.25 * (alfa - gamma) * desplazamiento)
+
+    frecuencias = np.asarray(frecuencias, dtype=float)
+    paso = frecuencias[1] - frecuencias[0] if len(frecuencias) > 1 else 0.0
+    posicion = frecuencias[elegidos] + desplazamiento * paso
+    resultado['frecuencia'][validos] = posicion[validos]
+    resultado['amplitud'][validos] = pico[validos]
+    resultado['bin'][validos] = elegidos[validos]
+    return resultado
+
+
+def tabla_picos(senal, n_picos=1, ventana="hann", relleno=1, beta=None,
+                frecuencia_muestreo=None, umbral=0.0):
+    # Atajo: estimar_espectro + detectar_picos sobre la amplitud corregida.
+    # Devuelve arrays (canales, n_picos) de frecuencia y amplitud de pico.
+    espectro = estimar_espectro(senal, ventana, relleno, beta, frecuencia_muestreo)
+    return detectar_picos(espectro['amplitud'], espectro['frecuencias'], n_picos, umbral)
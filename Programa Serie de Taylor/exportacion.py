@@ -0,0 +1,175 @@
+# Exportación por lotes de las tres figuras sin pantalla (backend Agg).
+#
+# Cada proceso construye una sola vez la PlantillaGraficas de la aplicación
+# (espectro, fase y señales, instantánea del osciloscopio) sobre lienzos
+# Agg y la reutiliza para todos sus elementos: por figura solo cambian los
+# datos de las líneas, los límites y el nombre del archivo. No se usa pyplot,
+# así que no hay estado global de figuras ni ventanas.
+#
+# Ejemplo:
+#   python exportacion.py --tipos seno cuadrada --frecuencias 1:50:100 \
+#       --formatos png svg --procesos 8 --salida figuras
+#   python exportacion.py --configuraciones lote.json --salida figuras
+#
+# lote.json es una lista de {"nombre": ..., "canal1": {...}, "canal2": {...}}
+# con los mismos parámetros que motor_senales.generar_senal.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import barrido
+import motor_senales
+
+FIGURAS = ("espectro", "fase", "osciloscopio")
+FORMATOS = ("png", "svg")
+
+# Estado por proceso: plantilla, decimador y figuras, creados en iniciar_proceso
+_proceso = {}
+
+
+def iniciar_proceso(dpi=100):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import decimacion
+    import graficas
+
+    matplotlib.style.use('dark_background')
+    fig1 = Figure(figsize=(10, 8), dpi=dpi)
+    fig2 = Figure(figsize=(10, 6), dpi=dpi)
+    fig3 = Figure(figsize=(10, 4), dpi=dpi)
+    for fig in (fig1, fig2, fig3):
+        FigureCanvasAgg(fig)
+    plantilla = graficas.PlantillaGraficas(fig1, fig1.subplots(3, 1), fig2, fig2.subplots(2, 1),
+                                           fig3, fig3.subplots())
+    fig3.tight_layout()
+    _proceso.update({
+        'plantilla': plantilla,
+        'decimador': decimacion.Decimador(),
+        'figuras': dict(zip(FIGURAS, (fig1, fig2, fig3))),
+        'dpi': dpi,
+    })
+
+
+def nombre_elemento(parametros):
+    return "{tipo}_f{frecuencia:g}_a{amplitud:g}_n{muestras}{sufijo}".format(
+        sufijo="" if parametros['continua'] else "_d", **parametros)
+
+
+def elementos_rejilla(rejilla):
+    return [{'nombre': nombre_elemento(c), 'canal1': c, 'canal2': None} for c in rejilla]
+
+
+def mostrar_osciloscopio(plantilla, resultado, canales, desplazamiento=0):
+    # Instantánea de un cuadro del osciloscopio, igual que el primer cuadro
+    # de la animación de la interfaz
+    import osciloscopio
+
+    senales = [resultado['senal{0}'.format(i + 1)] for i in range(canales)]
+    buffer = osciloscopio.BufferOsciloscopio(senales, plantilla.ax3.bbox.width)
+    cuadro = buffer.cuadro(desplazamiento)
+    for linea, y in zip(plantilla.lineas_osciloscopio, cuadro):
+        linea.set_data(buffer.eje_x, y)
+
+
+def exportar_elemento(elemento, directorio, formatos=("png",), figuras=FIGURAS):
+    plantilla = _proceso['plantilla']
+    parametros1, parametros2 = elemento['canal1'], elemento.get('canal2')
+    canales = 2 if parametros2 is not None else 1
+
+    resultado = motor_senales.analizar_canales(parametros1, parametros2)
+    plantilla.actualizar(resultado, canales, _proceso['decimador'], histeresis=False)
+    amplitud_maxima = max(parametros1['amplitud'],
+                          parametros2['amplitud'] if parametros2 is not None else 0, 1)
+    plantilla.preparar_osciloscopio(resultado['muestras'], amplitud_maxima)
+    if "osciloscopio" in figuras:
+        mostrar_osciloscopio(plantilla, resultado, canales)
+
+    rutas = []
+    for figura in figuras:
+        fig = _proceso['figuras'][figura]
+        for formato in formatos:
+            ruta = os.path.join(directorio, "{0}_{1}.{2}".format(elemento['nombre'], figura, formato))
+            fig.savefig(ruta, format=formato, dpi=_proceso['dpi'],
+                        facecolor=fig.get_facecolor())
+            rutas.append(ruta)
+    return rutas
+
+
+def exportar_lote(elementos, directorio, formatos=("png",), figuras=FIGURAS):
+    # Se ejecuta dentro de un proceso ya iniciado con iniciar_proceso
+    rutas = []
+    for elemento in elementos:
+        rutas.extend(exportar_elemento(elemento, directorio, formatos, figuras))
+    return rutas
+
+
+def exportar(elementos, directorio, formatos=("png",), figuras=FIGURAS, procesos=None,
+             tam_lote=8, dpi=100, progreso=None):
+    # Reparte los elementos en lotes entre procesos; cada proceso reutiliza su
+    # plantilla. progreso(hechos, total) se llama al terminar cada lote.
+    os.makedirs(directorio, exist_ok=True)
+    lotes = [elementos[i:i + tam_lote] for i in range(0, len(elementos), tam_lote)]
+    rutas = []
+    hechos = 0
+    with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_proceso,
+                             initargs=(dpi,)) as ejecutor:
+        futuros = {ejecutor.submit(exportar_lote, lote, directorio, formatos, figuras): len(lote)
+                   for lote in lotes}
+        for futuro in as_completed(futuros):
+            rutas.extend(futuro.result())
+            hechos += futuros[futuro]
+            if progreso is not None:
+                progreso(hechos, len(elementos))
+    return rutas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportación de figuras sin pantalla")
+    parser.add_argument("--configuraciones", help="archivo JSON con la lista de elementos")
+    parser.add_argument("--tipos", nargs="+", default=list(motor_senales.TIPOS_SENAL),
+                        choices=motor_senales.TIPOS_SENAL)
+    parser.add_argument("--frecuencias", default="5")
+    parser.add_argument("--amplitudes", default="1")
+    parser.add_argument("--muestras", default="1000")
+    parser.add_argument("--continua", choices=("si", "no", "ambas"), default="si")
+    parser.add_argument("--figuras", nargs="+", default=list(FIGURAS), choices=FIGURAS)
+    parser.add_argument("--formatos", nargs="+", default=["png"], choices=FORMATOS)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lote", type=int, default=8, help="elementos por tarea")
+    parser.add_argument("--salida", default="figuras")
+    args = parser.parse_args(argv)
+
+    if args.configuraciones:
+        with open(args.configuraciones, encoding="utf-8") as archivo:
+            elementos = json.load(archivo)
+    else:
+        continuas = {"si": [True], "no": [False], "ambas": [True, False]}[args.continua]
+        elementos = elementos_rejilla(barrido.construir_rejilla(
+            args.tipos, barrido.parsear_valores(args.frecuencias),
+            barrido.parsear_valores(args.amplitudes),
+            barrido.parsear_valores(args.muestras, int), continuas))
+
+    def progreso(hechos, total):
+        transcurrido = time.perf_counter() - inicio
+        print("\r{0}/{1} elementos ({2:.0f} figuras/min)".format(
+            hechos, total, 60 * hechos * len(args.figuras) * len(args.formatos)
+            / max(transcurrido, 1e-9)), end="", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    rutas = exportar(elementos, args.salida, args.formatos, args.figuras, args.procesos,
+                     args.lote, args.dpi, progreso)
+    print(file=sys.stderr)
+    print("{0} archivos en {1}".format(len(rutas), os.path.abspath(args.salida)))
+
+
+if __name__ == "__main__":
+    main()
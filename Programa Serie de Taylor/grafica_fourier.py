@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+import backend_fft
+import motor_senales
+
 # Pedir datos al usuario
 frecuencia = float(input("Ingrese la frecuencia de la señal (Hz): "))
 muestras = int(input("Ingrese el número de muestras: "))
@@ -9,9 +12,12 @@ muestras = int(input("Ingrese el número de muestras: "))
 t = np.linspace(0, 1, muestras)
 senal = np.sin(2 * np.pi * frecuencia * t)
 
-# Calcular Transformada de Fourier
-frecuencia_fft = np.fft.fftfreq(muestras, d=(t[1] - t[0]))
-amplitud_fft = np.abs(np.fft.fft(senal))
+# Calcular Transformada de Fourier (entrada real: solo la mitad no negativa)
+# con el backend elegido en SENALES_FFT (np.fft si no está definida)
+espectro = motor_senales.calcular_espectro(senal, backend=backend_fft.backend_entorno(),
+                                           productos=("magnitud",))
+frecuencia_fft = espectro['frecuencias'] / (muestras * (t[1] - t[0]))  # En Hz
+amplitud_fft = espectro['magnitud']
 
 # Graficar señal en el tiempo
 plt.figure(figsize=(12, 6))
@@ -24,7 +30,7 @@ plt.ylabel("Amplitud")
 
 # Graficar Transformada de Fourier
 plt.subplot(2, 1, 2)
-plt.plot(frecuencia_fft[:muestras//2], amplitud_fft[:muestras//2])
+plt.plot(frecuencia_fft, amplitud_fft)
 plt.title("Transformada de Fourier")
 plt.xlabel("Frecuencia (Hz)")
 plt.ylabel("Amplitud")
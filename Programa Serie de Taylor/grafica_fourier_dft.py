@@ -1,12 +1,35 @@
+import os
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from scipy.signal import square, sawtooth
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.colors as mcolors
 
+import adquisicion
+import backend_fft
+import cache_espectros
+import decimacion
+import graficas
+import instrumentacion
+import motor_senales
+import osciloscopio
+import trabajador
+
+# Etapas que se muestran con "Mostrar tiempos", en orden de ejecución
+ETAPAS = ("sintesis", "fft", "artistas", "dibujo", "blit", "cuadro")
+
+# Productos derivados que guarda cada análisis: ninguno. Magnitud y fase se
+# calculan por tramos al decimar (motor_senales.ProductoDiferido), así que
+# con 10^7 muestras × 2 canales en float32 la memoria pico baja de 572 MB
+# (float64 con todos los productos) a 191 MB. A cambio se recalculan en cada
+# zoom, desplazamiento o cambio de tamaño: con todo el rango visible, hasta
+# 40 ms por línea en float32 y 75 ms en float64.
+PRODUCTOS_INTERFAZ = ()
+
 class SignalGeneratorApp:
     def __init__(self, root):
         self.root = root
@@ -28,8 +51,38 @@ class SignalGeneratorApp:
         self.ani = None
         self.line1 = None
         self.line2 = None
+        self.texto_fps = None
+        
+        # Decimación mín/máx por píxel para las gráficas estáticas
+        self.decimador = decimacion.Decimador()
+        
+        # Cálculo en segundo plano: el bucle de Tk nunca se bloquea
+        self.trabajador = trabajador.TrabajadorCalculo(self.root)
+        # Señales y espectros ya calculados, por canal y parámetros
+        self.cache = cache_espectros.CacheEspectros(presupuesto_bytes=512 * 2 ** 20)
+        self.auto_actualizar = tk.BooleanVar(value=False)
+        # float32/complex64 en todo el cálculo: la mitad de memoria
+        self.precision_simple = tk.BooleanVar(value=False)
+        self.estado = tk.StringVar(value="")
+        # Tiempos por etapa (instrumentacion.py) en la línea de estado y en
+        # el osciloscopio
+        self.mostrar_tiempos = tk.BooleanVar(value=instrumentacion.trazador.activo)
+        self.actualizacion_programada = None
+        
+        # Modo en vivo: productor en segundo plano que llena un anillo
+        self.muestreo_vivo = tk.IntVar(value=1000000)
+        self.productor = None
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Cualquier cambio de parámetro relanza el cálculo si está activada la
+        # actualización automática; el trabajo anterior se descarta
+        for vars_dict in (self.senal1_vars, self.senal2_vars):
+            for var in vars_dict.values():
+                var.trace_add('write', self.on_param_change)
+        self.usar_canal2.trace_add('write', self.on_param_change)
+        self.precision_simple.trace_add('write', self.on_param_change)
         
     def configure_styles(self):
         # Configurar estilos modernos
@@ -141,6 +194,29 @@ class SignalGeneratorApp:
                               style='TButton')
         clear_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         
+        vivo_frame = ttk.Frame(control_frame, style='TFrame')
+        vivo_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(vivo_frame, text="Muestreo en vivo (S/s):").pack(side=tk.LEFT, padx=5)
+        ttk.Spinbox(vivo_frame, textvariable=self.muestreo_vivo,
+                    from_=1000, to=10000000, increment=100000, width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(vivo_frame, text="En Vivo", command=self.start_live,
+                   style='TButton').pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        ttk.Checkbutton(control_frame, text="Actualización automática",
+                        variable=self.auto_actualizar,
+                        style='TCheckbutton').pack(anchor=tk.W, pady=5)
+        ttk.Checkbutton(control_frame, text="Precisión simple (float32)",
+                        variable=self.precision_simple,
+                        style='TCheckbutton').pack(anchor=tk.W, pady=5)
+        tiempos_frame = ttk.Frame(control_frame, style='TFrame')
+        tiempos_frame.pack(fill=tk.X)
+        ttk.Checkbutton(tiempos_frame, text="Mostrar tiempos",
+                        variable=self.mostrar_tiempos, command=self.toggle_tiempos,
+                        style='TCheckbutton').pack(side=tk.LEFT, pady=5)
+        ttk.Button(tiempos_frame, text="Guardar traza", command=self.guardar_traza,
+                   style='TButton').pack(side=tk.RIGHT, padx=5)
+        ttk.Label(control_frame, textvariable=self.estado, wraplength=300).pack(anchor=tk.W, pady=5)
+        
         # Notebook para gráficos con pestañas
         self.notebook = ttk.Notebook(graph_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
@@ -165,21 +241,12 @@ class SignalGeneratorApp:
         self.fig2, self.axs2 = plt.subplots(2, 1, figsize=(10, 6), facecolor='#2c3e50')
         self.fig3, self.ax3 = plt.subplots(figsize=(10, 4), facecolor='#2c3e50')
         
-        # Configurar colores de ejes y texto
-        for fig in [self.fig1, self.fig2, self.fig3]:
-            fig.patch.set_facecolor('#2c3e50')
-        
-        for ax in [*self.axs1, *self.axs2, self.ax3]:
-            ax.set_facecolor('#34495e')
-            ax.tick_params(colors='#ecf0f1')
-            ax.xaxis.label.set_color('#ecf0f1')
-            ax.yaxis.label.set_color('#ecf0f1')
-            ax.title.set_color('#ecf0f1')
-            ax.spines['bottom'].set_color('#7f8c8d')
-            ax.spines['top'].set_color('#7f8c8d')
-            ax.spines['right'].set_color('#7f8c8d')
-            ax.spines['left'].set_color('#7f8c8d')
-            ax.grid(True, color='#4a6572', linestyle='--', linewidth=0.5)
+        # Estilo, rótulos y líneas se crean una sola vez; cada análisis solo
+        # actualiza los datos de las líneas existentes
+        self.plantilla = graficas.PlantillaGraficas(self.fig1, self.axs1, self.fig2, self.axs2,
+                                                    self.fig3, self.ax3)
+        self.line1, self.line2 = self.plantilla.lineas_osciloscopio
+        self.texto_fps = self.plantilla.texto_fps
         
         # Canvas para gráficos
         self.canvas1 = FigureCanvasTkAgg(self.fig1, tab1)
@@ -188,9 +255,26 @@ class SignalGeneratorApp:
         self.canvas2 = FigureCanvasTkAgg(self.fig2, tab2)
         self.canvas2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Al cambiar el tamaño del lienzo cambia el número de píxeles por eje;
+        # el ajuste de márgenes solo se recalcula entonces, no en cada dibujo
+        for canvas in (self.canvas1, self.canvas2):
+            canvas.mpl_connect('resize_event', self.decimador.redecimar_todo)
+            canvas.mpl_connect('resize_event', lambda event: event.canvas.figure.tight_layout())
+        
         self.canvas3 = FigureCanvasTkAgg(self.fig3, tab3)
         self.canvas3.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Redibujo por blit de las pestañas 1 y 2; la 3 la gestiona FuncAnimation
+        self.blits = {
+            0: graficas.RedibujoBlit(self.canvas1, self.plantilla.lineas_figura(self.fig1)),
+            1: graficas.RedibujoBlit(self.canvas2, self.plantilla.lineas_figura(self.fig2)),
+        }
+        self.canvases = [self.canvas1, self.canvas2, self.canvas3]
+        self.figuras = [self.fig1, self.fig2, self.fig3]
+        # Pestañas con cambios pendientes: índice -> requiere dibujo completo
+        self.pestanas_sucias = {}
+        self.notebook.bind('<<NotebookTabChanged>>', self.al_cambiar_pestana)
+        
         # Toolbars
         self.toolbar1 = NavigationToolbar2Tk(self.canvas1, tab1)
         self.toolbar1.update()
@@ -248,195 +332,171 @@ class SignalGeneratorApp:
                 child.configure(state='disabled')
     
     def generar_senal(self, tipo, frecuencia, muestras, amplitud, continua):
-        if continua:
-            t = np.linspace(0, 1, muestras)
-            argumento = 2 * np.pi * frecuencia * t
-        else:
-            t = np.arange(muestras)
-            argumento = 2 * np.pi * frecuencia * t / muestras  # Normalizado para discretas
-            
-        if tipo == "seno":
-            senal = amplitud * np.sin(argumento)
-        elif tipo == "cuadrada":
-            senal = amplitud * square(argumento)
-        elif tipo == "triangular":
-            senal = amplitud * sawtooth(argumento, width=0.5)
-        else:
-            raise ValueError("Tipo de señal no válido")
-        return t, senal
+        return motor_senales.generar_senal(tipo, frecuencia, muestras, amplitud, continua)
+    
+    def leer_parametros(self, vars_dict):
+        return {clave: var.get() for clave, var in vars_dict.items()}
     
     def generate_plots(self):
         try:
-            # Generar señal 1
-            t1, senal1 = self.generar_senal(
-                self.senal1_vars['tipo'].get(),
-                self.senal1_vars['frecuencia'].get(),
-                self.senal1_vars['muestras'].get(),
-                self.senal1_vars['amplitud'].get(),
-                self.senal1_vars['continua'].get()
-            )
-            
-            # Generar señal 2 si está activado
-            if self.usar_canal2.get():
-                t2, senal2 = self.generar_senal(
-                    self.senal2_vars['tipo'].get(),
-                    self.senal2_vars['frecuencia'].get(),
-                    self.senal2_vars['muestras'].get(),
-                    self.senal2_vars['amplitud'].get(),
-                    self.senal2_vars['continua'].get()
-                )
-            else:
-                muestras2 = self.senal1_vars['muestras'].get()
-                t2 = t1
-                senal2 = np.zeros(muestras2)
-            
-            # Ajuste para mismo tamaño
-            muestras1 = len(senal1)
-            muestras2 = len(senal2)
-            muestras = max(muestras1, muestras2)
-            
-            if len(senal1) < muestras:
-                senal1 = np.pad(senal1, (0, muestras - len(senal1)))
-            if len(senal2) < muestras:
-                senal2 = np.pad(senal2, (0, muestras - len(senal2)))
-            
-            t_anim = np.arange(muestras)
-            
-            # Calcular FFT
-            fft1 = np.fft.fft(senal1)
-            fft2 = np.fft.fft(senal2)
-            frecuencias = np.fft.fftfreq(muestras, d=1.0 / muestras)
-            
-            magnitude1 = np.abs(fft1)
-            magnitude2 = np.abs(fft2)
-            real1 = np.real(fft1)
-            real2 = np.real(fft2)
-            imag1 = np.imag(fft1)
-            imag2 = np.imag(fft2)
-            phase1 = np.angle(fft1)
-            phase2 = np.angle(fft2)
-            
-            # Limpiar gráficos anteriores
-            for ax in self.axs1:
-                ax.clear()
-            for ax in self.axs2:
-                ax.clear()
-            self.ax3.clear()
-            
-            # Configurar estilos de ejes después de limpiar
-            for ax in [*self.axs1, *self.axs2, self.ax3]:
-                ax.set_facecolor('#34495e')
-                ax.tick_params(colors='#ecf0f1')
-                ax.xaxis.label.set_color('#ecf0f1')
-                ax.yaxis.label.set_color('#ecf0f1')
-                ax.title.set_color('#ecf0f1')
-                ax.spines['bottom'].set_color('#7f8c8d')
-                ax.spines['top'].set_color('#7f8c8d')
-                ax.spines['right'].set_color('#7f8c8d')
-                ax.spines['left'].set_color('#7f8c8d')
-                ax.grid(True, color='#4a6572', linestyle='--', linewidth=0.5)
-            
-            # Ventana 1: Espectro, Real, Imaginario
-            self.axs1[0].plot(frecuencias[:muestras // 2], magnitude1[:muestras // 2], 'cyan', label='CH1', linewidth=2)
-            if self.usar_canal2.get():
-                self.axs1[0].plot(frecuencias[:muestras // 2], magnitude2[:muestras // 2], 'magenta', label='CH2', linewidth=2)
-            self.axs1[0].set_title("Espectro de Fourier (Magnitud)", fontweight='bold')
-            self.axs1[0].set_xlabel("Frecuencia")
-            self.axs1[0].set_ylabel("Magnitud")
-            self.axs1[0].legend(loc='upper right')
-            
-            self.axs1[1].plot(frecuencias[:muestras // 2], real1[:muestras // 2], 'cyan', label='CH1 Real', linewidth=2)
-            if self.usar_canal2.get():
-                self.axs1[1].plot(frecuencias[:muestras // 2], real2[:muestras // 2], 'magenta', label='CH2 Real', linewidth=2)
-            self.axs1[1].set_title("Parte Real de la Transformada de Fourier", fontweight='bold')
-            self.axs1[1].set_xlabel("Frecuencia")
-            self.axs1[1].set_ylabel("Valor Real")
-            self.axs1[1].legend(loc='upper right')
-            
-            self.axs1[2].plot(frecuencias[:muestras // 2], imag1[:muestras // 2], 'cyan', label='CH1 Imaginario', linewidth=2)
-            if self.usar_canal2.get():
-                self.axs1[2].plot(frecuencias[:muestras // 2], imag2[:muestras // 2], 'magenta', label='CH2 Imaginario', linewidth=2)
-            self.axs1[2].set_title("Parte Imaginaria de la Transformada de Fourier", fontweight='bold')
-            self.axs1[2].set_xlabel("Frecuencia")
-            self.axs1[2].set_ylabel("Valor Imaginario")
-            self.axs1[2].legend(loc='upper right')
-            
-            self.fig1.tight_layout()
-            
-            # Ventana 2: Fase y Señales combinadas
-            self.axs2[0].plot(frecuencias[:muestras // 2], phase1[:muestras // 2], 'cyan', label='CH1 Fase', linewidth=2)
-            if self.usar_canal2.get():
-                self.axs2[0].plot(frecuencias[:muestras // 2], phase2[:muestras // 2], 'magenta', label='CH2 Fase', linewidth=2)
-            self.axs2[0].set_title("Fase (radianes)", fontweight='bold')
-            self.axs2[0].set_xlabel("Frecuencia")
-            self.axs2[0].set_ylabel("Fase (rad)")
-            self.axs2[0].legend(loc='upper right')
-            
-            self.axs2[1].plot(t_anim, senal1, 'cyan', label='CH1', linewidth=2)
-            if self.usar_canal2.get():
-                self.axs2[1].plot(t_anim, senal2, 'magenta', label='CH2', linewidth=2)
-            self.axs2[1].set_title("Señales combinadas (Tiempo)", fontweight='bold')
-            self.axs2[1].set_xlabel("Índices (n)")
-            self.axs2[1].set_ylabel("Amplitud")
-            self.axs2[1].legend(loc='upper right')
+            parametros1 = self.leer_parametros(self.senal1_vars)
+            parametros2 = self.leer_parametros(self.senal2_vars) if self.usar_canal2.get() else None
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+            return
+        
+        self.submit_analysis(parametros1, parametros2)
+    
+    def submit_analysis(self, parametros1, parametros2):
+        # Cálculo delegado al motor sin interfaz, fuera del hilo de Tk
+        if self.productor is not None:
+            # El modo en vivo escribe en las mismas líneas de magnitud y
+            # reajusta sus límites: se detiene antes del nuevo análisis
+            self.detener_animacion()
+            self.stop_live()
+        self.estado.set("Calculando...")
+        self.trabajador.enviar(motor_senales.analizar_canales,
+                               lambda resultado: self.show_results(resultado, parametros1, parametros2),
+                               self.show_error,
+                               parametros1, parametros2, cache=self.cache,
+                               dtype=np.float32 if self.precision_simple.get() else np.float64,
+                               productos=PRODUCTOS_INTERFAZ,
+                               backend=backend_fft.backend_entorno())
+    
+    def show_results(self, resultado, parametros1, parametros2):
+        try:
+            canales = 2 if parametros2 is not None else 1
             
-            self.fig2.tight_layout()
+            # Ventanas 1 y 2: solo se actualizan los datos de las líneas
+            completas = self.plantilla.actualizar(resultado, canales, self.decimador)
             
             # Ventana 3: Preparar animación
-            self.senal1 = senal1
-            self.senal2 = senal2
-            self.muestras = muestras
-            self.t_anim = t_anim
+            self.senal1 = resultado['senal1']
+            self.senal2 = resultado['senal2']
+            self.muestras = resultado['muestras']
+            self.t_anim = resultado['t_anim']
             
-            # Configurar ejes para la animación
-            self.ax3.set_xlim(0, muestras)
-            max_amp = max(self.senal1_vars['amplitud'].get(), 
-                         self.senal2_vars['amplitud'].get() if self.usar_canal2.get() else 0, 
+            max_amp = max(parametros1['amplitud'], 
+                         parametros2['amplitud'] if parametros2 is not None else 0, 
                          1)
-            self.ax3.set_ylim(-max_amp * 1.5, max_amp * 1.5)
-            self.ax3.set_title("Simulación de Osciloscopio (Animación)", fontweight='bold')
-            self.ax3.set_xlabel("Índices (n)")
-            self.ax3.set_ylabel("Amplitud")
+            # La animación en curso usa el búfer de las señales anteriores y
+            # las líneas del osciloscopio se vacían aquí
+            self.detener_animacion()
+            self.plantilla.preparar_osciloscopio(self.muestras, max_amp)
+            completas.add(self.fig3)
             
-            # Crear líneas iniciales para la animación (vacías)
-            self.line1, = self.ax3.plot([], [], 'cyan', label='CH1', linewidth=2)
-            if self.usar_canal2.get():
-                self.line2, = self.ax3.plot([], [], 'magenta', label='CH2', linewidth=2)
-                self.ax3.legend(loc='upper right')
-            else:
-                self.ax3.legend(loc='upper right')
-            
-            # Actualizar canvases
-            self.canvas1.draw()
-            self.canvas2.draw()
-            self.canvas3.draw()
+            # Solo se dibuja la pestaña visible; las demás quedan pendientes
+            self.marcar_pestanas(completas)
+            estadisticas = self.cache.estadisticas()
+            estado = ("Caché: {aciertos} aciertos, {fallos} fallos, "
+                      "{desalojos} desalojos".format(**estadisticas))
+            if self.mostrar_tiempos.get():
+                estado += "\n" + instrumentacion.trazador.texto(ETAPAS)
+            self.estado.set(estado)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+            self.show_error(e)
+    
+    def show_error(self, e):
+        self.estado.set("")
+        messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+    
+    def on_param_change(self, *args):
+        if not self.auto_actualizar.get():
+            return
+        # Pequeña espera para agrupar las pulsaciones seguidas de un Spinbox
+        if self.actualizacion_programada is not None:
+            self.root.after_cancel(self.actualizacion_programada)
+        self.actualizacion_programada = self.root.after(100, self.auto_generate)
+    
+    def auto_generate(self):
+        self.actualizacion_programada = None
+        try:
+            parametros1 = self.leer_parametros(self.senal1_vars)
+            parametros2 = self.leer_parametros(self.senal2_vars) if self.usar_canal2.get() else None
+        except (tk.TclError, ValueError):
+            return  # Valor a medio escribir en un Spinbox
+        self.submit_analysis(parametros1, parametros2)
+    
+    def on_close(self):
+        self.stop_live()
+        self.trabajador.cerrar()
+        ruta = os.environ.get("SENALES_TRAZAS", "")
+        if ruta.endswith(".json"):
+            instrumentacion.trazador.volcar_json(ruta)
+        self.root.destroy()
+    
+    def toggle_tiempos(self):
+        instrumentacion.trazador.activo = self.mostrar_tiempos.get()
+    
+    def guardar_traza(self):
+        ruta = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("Traza de Chrome", "*.json")])
+        if ruta:
+            eventos = instrumentacion.trazador.volcar_json(ruta)
+            self.estado.set("Traza guardada: {0} tramos".format(eventos))
+    
+    def texto_cuadro(self, medidor, inicio):
+        # El cuadro completo se registra como un tramo más
+        trazador = instrumentacion.trazador
+        if not trazador.activo:
+            return medidor.texto()
+        trazador.registrar("cuadro", inicio, time.perf_counter() - inicio)
+        return "{0} | {1}".format(medidor.texto(), trazador.texto(ETAPAS))
+    
+    def marcar_pestanas(self, completas):
+        for indice, figura in enumerate(self.figuras):
+            self.pestanas_sucias[indice] = (self.pestanas_sucias.get(indice, False)
+                                            or figura in completas)
+        self.redibujar_pestana(self.notebook.index('current'))
+    
+    def redibujar_pestana(self, indice):
+        if indice not in self.pestanas_sucias:
+            return
+        completo = self.pestanas_sucias.pop(indice)
+        if indice in self.blits:
+            self.blits[indice].redibujar(completo)
+        else:
+            self.canvases[indice].draw_idle()
+    
+    def al_cambiar_pestana(self, event):
+        self.redibujar_pestana(self.notebook.index('current'))
     
     def start_animation(self):
         try:
             # Verificar que hay señales generadas
-            if not hasattr(self, 'senal1'):
+            if getattr(self, 'senal1', None) is None:
                 messagebox.showwarning("Advertencia", "Primero debe generar las señales")
                 return
             
             # Detener animación anterior si existe
-            if hasattr(self, 'ani'):
-                self.ani.event_source.stop()
+            self.detener_animacion()
+            self.stop_live()
+            
+            # Búfer circular precalculado: cada cuadro es una rebanada sin copia,
+            # ya reducida al ancho en píxeles del eje
+            usar_canal2 = self.usar_canal2.get()
+            senales = [self.senal1, self.senal2] if usar_canal2 else [self.senal1]
+            buffer = osciloscopio.BufferOsciloscopio(senales, self.ax3.bbox.width)
+            self.line1.set_data(buffer.eje_x, buffer.cuadro(0)[0])
+            if usar_canal2:
+                self.line2.set_data(buffer.eje_x, buffer.cuadro(0)[1])
+            medidor = osciloscopio.MedidorFPS()
             
             # Función de actualización para la animación
             def update(frame):
-                shift = frame % self.muestras
-                s1_shifted = np.roll(self.senal1, -shift)
-                self.line1.set_data(self.t_anim, s1_shifted)
+                inicio = time.perf_counter()
+                cuadro = buffer.cuadro(frame)
+                self.line1.set_data(buffer.eje_x, cuadro[0])
+                artistas = [self.line1]
+                if usar_canal2:
+                    self.line2.set_data(buffer.eje_x, cuadro[1])
+                    artistas.append(self.line2)
                 
-                if self.usar_canal2.get():
-                    s2_shifted = np.roll(self.senal2, -shift)
-                    self.line2.set_data(self.t_anim, s2_shifted)
-                    return self.line1, self.line2
-                else:
-                    return self.line1,
+                medidor.registrar(time.perf_counter() - inicio)
+                self.texto_fps.set_text(self.texto_cuadro(medidor, inicio))
+                artistas.append(self.texto_fps)
+                return artistas
             
             # Crear animación
             self.ani = FuncAnimation(self.fig3, update, frames=self.muestras, 
@@ -451,35 +511,100 @@ class SignalGeneratorApp:
         except Exception as e:
             messagebox.showerror("Error", f"Ocurrió un error en la animación: {str(e)}")
     
+    def detener_animacion(self):
+        if self.ani is not None:
+            self.ani.event_source.stop()
+            self.ani = None
+    
     def clear_plots(self):
-        # Limpiar gráficos
-        for ax in self.axs1:
-            ax.clear()
-            ax.set_facecolor('#34495e')
-            ax.grid(True, color='#4a6572', linestyle='--', linewidth=0.5)
-        
-        for ax in self.axs2:
-            ax.clear()
-            ax.set_facecolor('#34495e')
-            ax.grid(True, color='#4a6572', linestyle='--', linewidth=0.5)
-        
-        self.ax3.clear()
-        self.ax3.set_facecolor('#34495e')
-        self.ax3.grid(True, color='#4a6572', linestyle='--', linewidth=0.5)
-        
-        # Limpiar líneas de animación
-        self.line1 = None
-        self.line2 = None
-        
-        # Actualizar canvases
-        self.canvas1.draw()
-        self.canvas2.draw()
-        self.canvas3.draw()
+        # Descartar cualquier cálculo en curso
+        self.trabajador.cancelar()
+        self.estado.set("")
         
         # Detener animación si existe
-        if hasattr(self, 'ani'):
-            self.ani.event_source.stop()
-            del self.ani
+        self.detener_animacion()
+        self.stop_live()
+        
+        # Vaciar las líneas sin destruir ejes ni estilos
+        self.plantilla.limpiar(self.decimador)
+        self.senal1 = None
+        self.senal2 = None
+        
+        self.marcar_pestanas(set(self.figuras))
+
+    def start_live(self):
+        # Osciloscopio y espectro deslizante sobre datos que llegan de forma
+        # continua. La fuente sintética usa los parámetros de los canales con
+        # la frecuencia en Hz; cualquier otra fuente de adquisicion.py sirve.
+        try:
+            parametros = [self.leer_parametros(self.senal1_vars)]
+            if self.usar_canal2.get():
+                parametros.append(self.leer_parametros(self.senal2_vars))
+            frecuencia_muestreo = self.muestreo_vivo.get()
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+            return
+        
+        self.detener_animacion()
+        self.stop_live()
+        
+        # Se muestran dos periodos de CH1; el anillo guarda al menos el doble
+        capacidad = 1 << 20
+        ventana = int(2 * frecuencia_muestreo / max(parametros[0]['frecuencia'], 1e-9))
+        ventana = min(max(ventana, 64), capacidad // 2)
+        anillo = adquisicion.AnilloMuestras(len(parametros), capacidad)
+        fuente = adquisicion.FuenteSintetica(parametros, frecuencia_muestreo)
+        self.productor = adquisicion.Productor(fuente, anillo)
+        self.productor.start()
+        espectro = adquisicion.EspectroDeslizante(anillo, 65536, frecuencia_muestreo)
+        
+        canales = len(parametros)
+        self.plantilla.mostrar_canales(canales)
+        self.plantilla.preparar_osciloscopio(ventana, max([p['amplitud'] for p in parametros] + [1]))
+        cubeta = decimacion.tam_cubeta(ventana, self.ax3.bbox.width)
+        eje_x = (decimacion.eje_envolvente(-(-ventana // cubeta), cubeta) if cubeta > 1
+                 else np.arange(ventana))
+        lineas = self.plantilla.lineas_osciloscopio[:canales]
+        ax_magnitud, _, lineas_magnitud = self.plantilla.paneles[0]
+        productor = self.productor
+        medidor = osciloscopio.MedidorFPS()
+        
+        def update(frame):
+            inicio = time.perf_counter()
+            vista, _ = anillo.ultima_ventana(ventana)
+            if vista.shape[1] == ventana:
+                puntos = vista if cubeta == 1 else decimacion.envolvente_minmax(vista, cubeta)
+                for linea, y in zip(lineas, puntos):
+                    linea.set_data(eje_x, y)
+            
+            # Espectro deslizante en la pestaña 1, solo si está a la vista
+            if self.notebook.index('current') == 0:
+                resultado = espectro.calcular()
+                if resultado is not None:
+                    for linea, y in zip(lineas_magnitud, resultado['magnitud']):
+                        self.decimador.actualizar(linea, resultado['frecuencias'], y)
+                    ax_magnitud.relim(visible_only=True)
+                    completo = not graficas.limites_vigentes(ax_magnitud)
+                    if completo:
+                        ax_magnitud.autoscale_view()
+                    self.blits[0].redibujar(completo)
+            
+            medidor.registrar(time.perf_counter() - inicio)
+            estadisticas = productor.estadisticas()
+            self.texto_fps.set_text("{0} | {1:.2f} MS/s | perdidas {2}".format(
+                self.texto_cuadro(medidor, inicio), estadisticas['tasa'] / 1e6,
+                estadisticas['perdidas']))
+            return lineas + [self.texto_fps]
+        
+        self.ani = FuncAnimation(self.fig3, update, interval=33, blit=True,
+                                 cache_frame_data=False)
+        self.canvas3.draw()
+        self.notebook.select(2)
+    
+    def stop_live(self):
+        if self.productor is not None:
+            self.productor.detener()
+            self.productor = None
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,206 @@
+# Modelo persistente de las tres figuras de la aplicación.
+#
+# Los ejes se estilizan y rotulan una sola vez y las líneas se crean vacías;
+# cada nuevo análisis solo actualiza sus datos con set_data. Las mismas
+# figuras sirven para la interfaz Tk y para cualquier otro lienzo (por
+# ejemplo Agg), porque aquí no se importa nada de tkinter.
+
+import numpy as np
+
+import motor_senales
+import piramide_espectral
+from instrumentacion import tramo
+
+COLOR_FIGURA = '#2c3e50'
+COLOR_EJE = '#34495e'
+COLOR_TEXTO = '#ecf0f1'
+COLOR_BORDE = '#7f8c8d'
+COLOR_REJILLA = '#4a6572'
+COLORES_CANAL = ('cyan', 'magenta')
+
+# (clave del espectro, título, etiqueta y, sufijo de la leyenda)
+PANELES_ESPECTRO = [
+    ('magnitud', "Espectro de Fourier (Magnitud)", "Magnitud", ""),
+    ('real', "Parte Real de la Transformada de Fourier", "Valor Real", " Real"),
+    ('imag', "Parte Imaginaria de la Transformada de Fourier", "Valor Imaginario", " Imaginario"),
+]
+
+
+def aplicar_estilo(ax):
+    ax.set_facecolor(COLOR_EJE)
+    ax.tick_params(colors=COLOR_TEXTO)
+    ax.xaxis.label.set_color(COLOR_TEXTO)
+    ax.yaxis.label.set_color(COLOR_TEXTO)
+    ax.title.set_color(COLOR_TEXTO)
+    for borde in ('bottom', 'top', 'right', 'left'):
+        ax.spines[borde].set_color(COLOR_BORDE)
+    ax.grid(True, color=COLOR_REJILLA, linestyle='--', linewidth=0.5)
+
+
+def rotular(ax, titulo, etiqueta_x, etiqueta_y):
+    ax.set_title(titulo, fontweight='bold')
+    ax.set_xlabel(etiqueta_x)
+    ax.set_ylabel(etiqueta_y)
+
+
+def limites_vigentes(ax, ocupacion=0.5):
+    # Histéresis del autoescalado: se conservan los límites actuales mientras
+    # los datos quepan en ellos y ocupen al menos 'ocupacion' del rango. Así
+    # los ajustes pequeños de parámetros no cambian los ejes y se pueden
+    # redibujar solo las líneas.
+    datos = ax.dataLim
+    if not (np.all(np.isfinite(datos.get_points())) and ax.get_autoscale_on()):
+        return False
+    x0, x1 = sorted(ax.get_xlim())
+    y0, y1 = sorted(ax.get_ylim())
+    cabe = x0 <= datos.x0 and datos.x1 <= x1 and y0 <= datos.y0 and datos.y1 <= y1
+    ocupa = (datos.width >= ocupacion * (x1 - x0)
+             and datos.height >= ocupacion * (y1 - y0))
+    return cabe and ocupa
+
+
+class PlantillaGraficas:
+    def __init__(self, fig1, axs1, fig2, axs2, fig3, ax3):
+        self.fig1, self.axs1 = fig1, axs1
+        self.fig2, self.axs2 = fig2, axs2
+        self.fig3, self.ax3 = fig3, ax3
+
+        for fig in (fig1, fig2, fig3):
+            fig.patch.set_facecolor(COLOR_FIGURA)
+        for ax in (*axs1, *axs2, ax3):
+            aplicar_estilo(ax)
+
+        # Líneas por panel: una por canal, en el orden de COLORES_CANAL
+        self.paneles = []
+        for ax, (clave, titulo, etiqueta_y, sufijo) in zip(axs1, PANELES_ESPECTRO):
+            rotular(ax, titulo, "Frecuencia", etiqueta_y)
+            self.paneles.append((ax, clave, self.crear_lineas(ax, sufijo)))
+        rotular(axs2[0], "Fase (radianes)", "Frecuencia", "Fase (rad)")
+        self.paneles.append((axs2[0], 'fase', self.crear_lineas(axs2[0], " Fase")))
+        rotular(axs2[1], "Señales combinadas (Tiempo)", "Índices (n)", "Amplitud")
+        self.paneles.append((axs2[1], 'senal', self.crear_lineas(axs2[1], "")))
+
+        rotular(ax3, "Simulación de Osciloscopio (Animación)", "Índices (n)", "Amplitud")
+        self.lineas_osciloscopio = self.crear_lineas(ax3, "")
+        self.texto_fps = ax3.text(0.01, 0.97, "", transform=ax3.transAxes,
+                                  color=COLOR_TEXTO, fontsize=9, va='top')
+
+        self.canales_visibles = None
+        self.mostrar_canales(1)
+        for fig in (fig1, fig2):
+            fig.tight_layout()
+
+    def crear_lineas(self, ax, sufijo):
+        return [ax.plot([], [], color, label='CH{0}{1}'.format(i + 1, sufijo), linewidth=2)[0]
+                for i, color in enumerate(COLORES_CANAL)]
+
+    def lineas_figura(self, fig):
+        return [linea for ax, _, lineas in self.paneles if ax.figure is fig for linea in lineas]
+
+    def mostrar_canales(self, canales):
+        # Devuelve True si cambió la visibilidad (y con ella las leyendas)
+        if canales == self.canales_visibles:
+            return False
+        self.canales_visibles = canales
+        for ax, _, lineas in self.paneles + [(self.ax3, None, self.lineas_osciloscopio)]:
+            for i, linea in enumerate(lineas):
+                linea.set_visible(i < canales)
+            ax.legend(handles=lineas[:canales], loc='upper right')
+        return True
+
+    def actualizar(self, resultado, canales, decimador=None, histeresis=True):
+        # Actualiza los datos de las figuras 1 y 2. Devuelve el conjunto de
+        # figuras que necesitan un redibujo completo (límites o leyendas
+        # distintos); en las demás basta con redibujar las líneas. Sin
+        # histeresis los ejes siempre se ajustan a los datos (exportación).
+        with tramo("artistas"):
+            return self.actualizar_lineas(resultado, canales, decimador, histeresis)
+
+    def actualizar_lineas(self, resultado, canales, decimador, histeresis):
+        completas = set()
+        if self.mostrar_canales(canales):
+            completas.update((self.fig1, self.fig2, self.fig3))
+
+        for ax, clave, lineas in self.paneles:
+            limites = (ax.get_xlim(), ax.get_ylim())
+            for i, linea in enumerate(lineas[:canales]):
+                if clave == 'senal':
+                    x, y = resultado['t_anim'], resultado['senal{0}'.format(i + 1)]
+                else:
+                    # Magnitud y fase pueden no estar calculadas (productos a
+                    # demanda): el decimador las deriva por tramos
+                    espectro = resultado['espectro{0}'.format(i + 1)]
+                    x, y = espectro['frecuencias'], motor_senales.producto(espectro, clave)
+                if decimador is not None:
+                    decimador.actualizar(linea, x, y)
+                    if clave == 'magnitud':
+                        decimador.registrar_zoom(
+                            linea, lambda espectro=espectro:
+                            piramide_espectral.PiramideEspectral.desde_espectro(espectro))
+                else:
+                    linea.set_data(x, np.asarray(y))
+            ax.relim(visible_only=True)
+            if histeresis and limites_vigentes(ax):
+                continue
+            # Un zoom previo con la barra de herramientas desactiva el autoescalado
+            ax.set_autoscale_on(True)
+            ax.autoscale_view()
+            if (ax.get_xlim(), ax.get_ylim()) != limites:
+                completas.add(ax.figure)
+        return completas
+
+    def preparar_osciloscopio(self, muestras, amplitud_maxima):
+        for linea in self.lineas_osciloscopio:
+            linea.set_data([], [])
+        self.texto_fps.set_text("")
+        self.ax3.set_xlim(0, muestras)
+        self.ax3.set_ylim(-amplitud_maxima * 1.5, amplitud_maxima * 1.5)
+
+    def limpiar(self, decimador=None):
+        for _, _, lineas in self.paneles:
+            for linea in lineas:
+                linea.set_data([], [])
+        if decimador is not None:
+            decimador.limpiar()
+        for linea in self.lineas_osciloscopio:
+            linea.set_data([], [])
+        self.texto_fps.set_text("")
+
+
+class RedibujoBlit:
+    # Redibuja solo las líneas sobre un fondo guardado tras el último dibujo
+    # completo. Los artistas quedan marcados como animados, de modo que
+    # canvas.draw() pinta el fondo y este objeto les añade las líneas.
+    def __init__(self, canvas, artistas):
+        self.canvas = canvas
+        self.artistas = list(artistas)
+        self.fondo = None
+        for artista in self.artistas:
+            artista.set_animated(True)
+        canvas.mpl_connect('draw_event', self.al_dibujar)
+
+    def al_dibujar(self, evento):
+        self.fondo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.dibujar_artistas()
+
+    def dibujar_artistas(self):
+        figura = self.canvas.figure
+        for artista in self.artistas:
+            if artista.get_visible():
+                figura.draw_artist(artista)
+        # Las leyendas se repintan encima para que las líneas no las tapen
+        for ax in figura.axes:
+            leyenda = ax.get_legend()
+            if leyenda is not None:
+                figura.draw_artist(leyenda)
+
+    def redibujar(self, completo=False):
+        if completo or self.fondo is None:
+            # Dibujo inmediato (no draw_idle) para que el tramo mida su costo
+            with tramo("dibujo"):
+                self.canvas.draw()
+            return
+        with tramo("blit"):
+            self.canvas.restore_region(self.fondo)
+            self.dibujar_artistas()
+            self.canvas.blit(self.canvas.figure.bbox)
@@ -0,0 +1,422 @@
+# Grafo de señales componible para generar vectores de prueba.
+#
+# Las señales se describen como un grafo de nodos: fuentes (Tono, Ruido,
+# Constante), operaciones (Suma, Producto, Afin; también con +, - y * entre
+# nodos y números), moduladores (am, FM) y filtros (Filtro, con scipy).
+# compilar() ordena el grafo una sola vez (un nodo usado varias veces se
+# evalúa una sola vez), asigna a cada nodo un búfer de tam_bloque muestras y
+# recicla los búferes de los nodos que ya no se usan; las operaciones
+# elementales escriben sobre el búfer de su primera entrada cuando esta
+# muere ahí. Cada bloque se evalúa de principio a fin sobre una base de
+# tiempo compartida con ufuncs en sitio (out=), así que los temporales son
+# del tamaño del bloque y quedan en caché, nunca del largo total de la
+# señal. El estado (fase de cada oscilador, generador de ruido, estado de
+# los filtros) pasa de un bloque al siguiente, de modo que evaluar por
+# bloques da lo mismo que evaluar de una vez.
+#
+# Las fases se acumulan en ciclos (módulo 1) y en float64, como en
+# analisis_streaming.generar_bloques; con dtype=np.float32 solo se
+# convierte el resultado de cada nodo.
+#
+# Ejemplo:
+#   portadora = Tono("seno", 10e3)
+#   senal = am(portadora, Tono("triangular", 50.0), 0.5) + Ruido(0.01, semilla=1)
+#   programa = compilar([senal, Filtro.butterworth(senal, 4, 2e3)], 100e3)
+#   vectores = programa.evaluar(10 ** 7)   # (2, 10^7)
+#   for bloque in programa.bloques(): ...  # o por bloques, sin límite
+
+import abc
+import numbers
+
+import numpy as np
+
+# Muestras por bloque: unos 128 KiB por búfer float64
+TAM_BLOQUE = 1 << 14
+
+
+class Nodo(abc.ABC):
+    # entradas: nodos de los que depende; en_sitio indica que evaluar()
+    # admite que out sea el búfer de la primera entrada
+    entradas = ()
+    en_sitio = False
+
+    def preparar(self, frecuencia_muestreo, dtype):
+        # Estado inicial de este nodo en un programa compilado
+        return None
+
+    @abc.abstractmethod
+    def evaluar(self, estado, entradas, out, contexto):
+        # Escribe en out las muestras del bloque actual
+        pass
+
+    def __add__(self, otro):
+        if isinstance(otro, numbers.Real):
+            return Afin(self, 1.0, otro)
+        return Suma(self, otro)
+
+    __radd__ = __add__
+
+    def __sub__(self, otro):
+        return self + (-otro)
+
+    def __rsub__(self, otro):
+        return (-self) + otro
+
+    def __mul__(self, otro):
+        if isinstance(otro, numbers.Real):
+            return Afin(self, otro, 0.0)
+        return Producto(self, otro)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Afin(self, -1.0, 0.0)
+
+
+def como_nodo(valor):
+    return valor if isinstance(valor, Nodo) else Constante(valor)
+
+
+def onda(tipo, ciclos, out):
+    # Forma de onda de amplitud 1 a partir de la fase en ciclos (se modifica
+    # 'ciclos'); mismas definiciones que motor_senales.forma_onda. Dentro de
+    # un bloque los ciclos no pasan de unos miles, así que el seno no
+    # necesita la reducción módulo 1 (error ~1e-12)
+    if tipo == "seno":
+        ciclos *= 2 * np.pi
+        np.sin(ciclos, out=out)
+        return
+    np.mod(ciclos, 1.0, out=ciclos)
+    if tipo == "cuadrada":
+        # 1 en la primera mitad del periodo, -1 en la segunda
+        ciclos *= 2
+        np.floor(ciclos, out=ciclos)
+        np.multiply(ciclos, -2, out=out)
+        out += 1
+    elif tipo == "triangular":
+        ciclos *= 2
+        ciclos -= 1
+        np.abs(ciclos, out=ciclos)
+        np.multiply(ciclos, -2, out=out)
+        out += 1
+    else:
+        raise ValueError("Tipo de señal no válido")
+
+
+class Constante(Nodo):
+    def __init__(self, valor):
+        self.valor = float(valor)
+
+    def evaluar(self, estado, entradas, out, contexto):
+        out.fill(self.valor)
+
+
+class Tono(Nodo):
+    def __init__(self, tipo, frecuencia, amplitud=1.0, fase=0.0):
+        # frecuencia en Hz (o en ciclos por muestra·frecuencia_muestreo);
+        # fase inicial en radianes
+        self.tipo = tipo
+        self.frecuencia = frecuencia
+        self.amplitud = amplitud
+        self.fase = fase
+        onda(tipo, np.zeros(1), np.empty(1))  # Valida el tipo al construir
+
+    def preparar(self, frecuencia_muestreo, dtype):
+        return {'paso': self.frecuencia / frecuencia_muestreo,
+                'ciclos': (self.fase / (2 * np.pi)) % 1.0}
+
+    def evaluar(self, estado, entradas, out, contexto):
+        n = len(out)
+        ciclos = contexto.escritorio[0][:n]
+        np.multiply(contexto.indices[:n], estado['paso'], out=ciclos)
+        ciclos += estado['ciclos']
+        estado['ciclos'] = (estado['ciclos'] + estado['paso'] * n) % 1.0
+        onda(self.tipo, ciclos, out)
+        if self.amplitud != 1.0:
+            out *= self.amplitud
+
+
+class FM(Nodo):
+    # Oscilador con frecuencia instantánea frecuencia + desviacion·moduladora
+    # (Hz); la fase es la suma acumulada de la frecuencia instantánea
+    def __init__(self, moduladora, frecuencia, desviacion, tipo="seno", amplitud=1.0):
+        self.entradas = (como_nodo(moduladora),)
+        self.frecuencia = frecuencia
+        self.desviacion = desviacion
+        self.tipo = tipo
+        self.amplitud = amplitud
+        onda(tipo, np.zeros(1), np.empty(1))
+
+    def preparar(self, frecuencia_muestreo, dtype):
+        return {'frecuencia_muestreo': frecuencia_muestreo, 'ciclos': 0.0}
+
+    def evaluar(self, estado, entradas, out, contexto):
+        n = len(out)
+        incrementos, ciclos = (b[:n] for b in contexto.escritorio)
+        np.multiply(entradas[0], self.desviacion / estado['frecuencia_muestreo'],
+                    out=incrementos)
+        incrementos += self.frecuencia / estado['frecuencia_muestreo']
+        # Fase de la muestra i: suma de los incrementos anteriores a i
+        np.cumsum(incrementos, out=ciclos)
+        total = ciclos[-1]
+        ciclos -= incrementos
+        ciclos += estado['ciclos']
+        estado['ciclos'] = (estado['ciclos'] + total) % 1.0
+        onda(self.tipo, ciclos, out)
+        if self.amplitud != 1.0:
+            out *= self.amplitud
+
+
+class Ruido(Nodo):
+    # Ruido blanco: normal de desviación 'amplitud' o uniforme en
+    # [-amplitud, amplitud). Con semilla la secuencia es reproducible y no
+    # depende del tamaño de bloque ni del dtype (se genera en float64).
+    def __init__(self, amplitud=1.0, semilla=None, distribucion="normal"):
+        if distribucion not in ("normal", "uniforme"):
+            raise ValueError("Distribución de ruido no válida")
+        self.amplitud = amplitud
+        self.semilla = semilla
+        self.distribucion = distribucion
+
+    def preparar(self, frecuencia_muestreo, dtype):
+        return np.random.default_rng(self.semilla)
+
+    def evaluar(self, estado, entradas, out, contexto):
+        valores = contexto.escritorio[0][:len(out)]
+        if self.distribucion == "normal":
+            estado.standard_normal(out=valores)
+            np.multiply(valores, self.amplitud, out=out)
+        else:
+            estado.random(out=valores)
+            valores -= 0.5
+            np.multiply(valores, 2 * self.amplitud, out=out)
+
+
+class Suma(Nodo):
+    en_sitio = True
+
+    def __init__(self, *entradas):
+        self.entradas = tuple(como_nodo(e) for e in entradas)
+        if len(self.entradas) < 2:
+            raise ValueError("Se necesitan al menos dos entradas")
+
+    def evaluar(self, estado, entradas, out, contexto):
+        np.add(entradas[0], entradas[1], out=out)
+        for entrada in entradas[2:]:
+            out += entrada
+
+
+class Producto(Nodo):
+    en_sitio = True
+
+    def __init__(self, *entradas):
+        self.entradas = tuple(como_nodo(e) for e in entradas)
+        if len(self.entradas) < 2:
+            raise ValueError("Se necesitan al menos dos entradas")
+
+    def evaluar(self, estado, entradas, out, contexto):
+        np.multiply(entradas[0], entradas[1], out=out)
+        for entrada in entradas[2:]:
+            out *= entrada
+
+
+class Afin(Nodo):
+    # ganancia·entrada + desplazamiento
+    en_sitio = True
+
+    def __init__(self, entrada, ganancia=1.0, desplazamiento=0.0):
+        self.entradas = (como_nodo(entrada),)
+        self.ganancia = ganancia
+        self.desplazamiento = desplazamiento
+
+    def evaluar(self, estado, entradas, out, contexto):
+        np.multiply(entradas[0], self.ganancia, out=out)
+        if self.desplazamiento:
+            out += self.desplazamiento
+
+
+def am(portadora, moduladora, indice=1.0):
+    # Modulación de amplitud: portadora·(1 + indice·moduladora)
+    return Producto(portadora, Afin(moduladora, indice, 1.0))
+
+
+class Filtro(Nodo):
+    # Filtro IIR/FIR (b, a) con scipy.signal.lfilter; el estado interno pasa
+    # de un bloque al siguiente y parte del reposo
+    def __init__(self, entrada, b, a=(1.0,)):
+        self.entradas = (como_nodo(entrada),)
+        self.b = b
+        self.a = a
+        self.diseno = None
+
+    @classmethod
+    def butterworth(cls, entrada, orden, corte, tipo="lowpass"):
+        # corte en Hz (o par de frecuencias para pasa/rechaza banda); los
+        # coeficientes se calculan al compilar, cuando se conoce el muestreo
+        filtro = cls(entrada, None, None)
+        filtro.diseno = (orden, corte, tipo)
+        return filtro
+
+    def preparar(self, frecuencia_muestreo, dtype):
+        from scipy import signal
+
+        b, a = self.b, self.a
+        if self.diseno is not None:
+            orden, corte, tipo = self.diseno
+            b, a = signal.butter(orden, corte, btype=tipo, fs=frecuencia_muestreo)
+        b = np.atleast_1d(np.asarray(b, dtype=float))
+        a = np.atleast_1d(np.asarray(a, dtype=float))
+        return {'lfilter': signal.lfilter, 'b': b, 'a': a,
+                'zi': np.zeros(max(len(a), len(b)) - 1)}
+
+    def evaluar(self, estado, entradas, out, contexto):
+        y, estado['zi'] = estado['lfilter'](estado['b'], estado['a'], entradas[0],
+                                            zi=estado['zi'])
+        out[:] = y
+
+
+def desde_parametros(parametros):
+    # Tono equivalente a un canal de la aplicación (tipo, frecuencia en
+    # ciclos por señal, amplitud, muestras, continua) y la frecuencia de
+    # muestreo con la que hay que compilarlo, como en
+    # analisis_streaming.bloques_senal
+    muestras = parametros['muestras']
+    frecuencia_muestreo = max(muestras - 1, 1) if parametros['continua'] else muestras
+    return (Tono(parametros['tipo'], parametros['frecuencia'], parametros['amplitud']),
+            frecuencia_muestreo)
+
+
+class Contexto:
+    # Base de tiempo y búferes auxiliares float64 compartidos por los nodos
+    def __init__(self, tam_bloque):
+        self.indices = np.arange(tam_bloque, dtype=float)
+        self.escritorio = (np.empty(tam_bloque), np.empty(tam_bloque))
+        self.inicio = 0
+
+
+def ordenar(salidas):
+    # Orden topológico (dependencias primero) sin repetir nodos compartidos
+    orden = []
+    visitados = set()
+    pendientes = [(nodo, False) for nodo in reversed(salidas)]
+    while pendientes:
+        nodo, listo = pendientes.pop()
+        if listo:
+            orden.append(nodo)
+            continue
+        if id(nodo) in visitados:
+            continue
+        visitados.add(id(nodo))
+        pendientes.append((nodo, True))
+        pendientes.extend((e, False) for e in reversed(nodo.entradas)
+                          if id(e) not in visitados)
+    return orden
+
+
+class Programa:
+    # Grafo compilado. También sirve como fuente de adquisicion.Productor
+    # (canales, frecuencia_muestreo, leer).
+    tiempo_real = True
+
+    def __init__(self, salidas, frecuencia_muestreo, tam_bloque=TAM_BLOQUE, dtype=np.float64):
+        if isinstance(salidas, Nodo):
+            salidas = [salidas]
+        self.salidas = [como_nodo(s) for s in salidas]
+        self.canales = len(self.salidas)
+        self.frecuencia_muestreo = frecuencia_muestreo
+        self.tam_bloque = tam_bloque
+        self.dtype = np.dtype(dtype)
+        self.orden = ordenar(self.salidas)
+        self.asignar_buferes()
+        self.bloque = np.empty((self.canales, tam_bloque), dtype=self.dtype)
+        self.reiniciar()
+
+    def asignar_buferes(self):
+        # Vida de cada nodo: hasta su último consumidor (las salidas, hasta
+        # el final del bloque). Un búfer liberado se reutiliza en el
+        # siguiente nodo; los nodos en_sitio heredan el de su primera entrada
+        posicion = {id(nodo): i for i, nodo in enumerate(self.orden)}
+        ultimo = {id(nodo): i for i, nodo in enumerate(self.orden)}
+        for i, nodo in enumerate(self.orden):
+            for entrada in nodo.entradas:
+                ultimo[id(entrada)] = i
+        for nodo in self.salidas:
+            ultimo[id(nodo)] = len(self.orden)
+
+        self.ranuras = []  # Índice del búfer de cada nodo, en orden
+        libres = []
+        total = 0
+        for i, nodo in enumerate(self.orden):
+            ranuras_entradas = [self.ranuras[posicion[id(e)]] for e in nodo.entradas]
+            # Si la primera entrada se repite más adelante, escribir sobre
+            # ella la destruiría antes de volver a leerla
+            primera = nodo.entradas[0] if nodo.entradas else None
+            if (nodo.en_sitio and ultimo[id(primera)] == i
+                    and all(e is not primera for e in nodo.entradas[1:])):
+                ranura = ranuras_entradas[0]
+            elif libres:
+                ranura = libres.pop()
+            else:
+                ranura = total
+                total += 1
+            self.ranuras.append(ranura)
+            muertas = {ranuras_entradas[j] for j, e in enumerate(nodo.entradas)
+                       if ultimo[id(e)] == i}
+            libres.extend(muertas - {ranura})
+        self.entradas = [[posicion[id(e)] for e in nodo.entradas] for nodo in self.orden]
+        self.posiciones_salida = [posicion[id(nodo)] for nodo in self.salidas]
+        self.buferes = np.empty((total, self.tam_bloque), dtype=self.dtype)
+
+    def reiniciar(self):
+        # Vuelve a la muestra 0 con el estado inicial de todos los nodos
+        self.estados = [nodo.preparar(self.frecuencia_muestreo, self.dtype)
+                        for nodo in self.orden]
+        self.contexto = Contexto(self.tam_bloque)
+        self.total = None
+
+    def calcular_bloque(self, n, destino):
+        # Evalúa las n muestras siguientes y las escribe en destino (canales, n)
+        buferes = self.buferes[:, :n]
+        for nodo, estado, ranura, entradas in zip(self.orden, self.estados, self.ranuras,
+                                                  self.entradas):
+            nodo.evaluar(estado, [buferes[self.ranuras[j]] for j in entradas],
+                         buferes[ranura], self.contexto)
+        for fila, j in zip(destino, self.posiciones_salida):
+            fila[:] = buferes[self.ranuras[j]]
+        self.contexto.inicio += n
+
+    def evaluar(self, muestras):
+        # Las 'muestras' siguientes en un arreglo nuevo: (canales, muestras),
+        # o un vector si el grafo tiene una sola salida
+        resultado = np.empty((self.canales, muestras), dtype=self.dtype)
+        for inicio in range(0, muestras, self.tam_bloque):
+            fin = min(inicio + self.tam_bloque, muestras)
+            self.calcular_bloque(fin - inicio, resultado[:, inicio:fin])
+        return resultado[0] if self.canales == 1 else resultado
+
+    def bloques(self, total=None):
+        # Bloques (canales, n) hasta 'total' muestras (o sin fin). El arreglo
+        # entregado se reutiliza: hay que copiarlo si se quiere conservar.
+        emitidas = 0
+        while total is None or emitidas < total:
+            n = self.tam_bloque if total is None else min(self.tam_bloque, total - emitidas)
+            self.calcular_bloque(n, self.bloque[:, :n])
+            emitidas += n
+            yield self.bloque[:, :n]
+
+    def leer(self):
+        # Interfaz de fuente de adquisicion.py; limitar() fija un final
+        restantes = self.tam_bloque if self.total is None else self.total - self.contexto.inicio
+        if restantes <= 0:
+            return None
+        n = min(self.tam_bloque, restantes)
+        self.calcular_bloque(n, self.bloque[:, :n])
+        return self.bloque[:, :n]
+
+    def limitar(self, total):
+        self.total = total
+        return self
+
+
+def compilar(salidas, frecuencia_muestreo, tam_bloque=TAM_BLOQUE, dtype=np.float64):
+    return Programa(salidas, frecuencia_muestreo, tam_bloque, dtype)
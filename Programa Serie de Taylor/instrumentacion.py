@@ -0,0 +1,87 @@
+# Medición de tiempos por etapa (síntesis, FFT, artistas, dibujo, ...).
+#
+# Cada etapa se envuelve en "with tramo('nombre'):". Con el trazador
+# inactivo (lo normal) tramo devuelve un contexto vacío compartido y el costo
+# es una llamada de función; activo, guarda cada tramo con su hilo y acumula
+# estadísticas por nombre para mostrarlas en pantalla. volcar_json escribe
+# los tramos en formato de traza de Chrome (chrome://tracing, Perfetto).
+#
+# La variable de entorno SENALES_TRAZAS activa el trazador al importar el
+# módulo; si su valor termina en .json, la interfaz vuelca ahí la traza al
+# cerrarse.
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class Trazador:
+    def __init__(self, capacidad=100000):
+        self.activo = False
+        self.tramos = deque(maxlen=capacidad)  # (nombre, inicio, duración, hilo)
+        self.estadisticas = {}  # nombre -> [llamadas, total, última, máxima]
+        self.cerrojo = threading.Lock()
+        self.origen = time.perf_counter()
+        self.vacio = contextlib.nullcontext()
+
+    def tramo(self, nombre):
+        if not self.activo:
+            return self.vacio
+        return self.medir(nombre)
+
+    @contextlib.contextmanager
+    def medir(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, inicio, time.perf_counter() - inicio)
+
+    def registrar(self, nombre, inicio, duracion):
+        with self.cerrojo:
+            self.tramos.append((nombre, inicio, duracion, threading.get_ident()))
+            estadistica = self.estadisticas.setdefault(nombre, [0, 0.0, 0.0, 0.0])
+            estadistica[0] += 1
+            estadistica[1] += duracion
+            estadistica[2] = duracion
+            estadistica[3] = max(estadistica[3], duracion)
+
+    def limpiar(self):
+        with self.cerrojo:
+            self.tramos.clear()
+            self.estadisticas.clear()
+            self.origen = time.perf_counter()
+
+    def resumen(self):
+        # nombre -> llamadas, media_ms, ultima_ms, maxima_ms
+        with self.cerrojo:
+            return {nombre: {'llamadas': n, 'media_ms': 1e3 * total / n,
+                             'ultima_ms': 1e3 * ultima, 'maxima_ms': 1e3 * maxima}
+                    for nombre, (n, total, ultima, maxima) in self.estadisticas.items()}
+
+    def texto(self, nombres=None):
+        # Una línea para superponer en la interfaz: última duración por etapa
+        resumen = self.resumen()
+        nombres = resumen.keys() if nombres is None else [n for n in nombres if n in resumen]
+        return " | ".join("{0} {1:.1f} ms".format(n, resumen[n]['ultima_ms']) for n in nombres)
+
+    def volcar_json(self, ruta):
+        with self.cerrojo:
+            tramos = list(self.tramos)
+        eventos = [{'name': nombre, 'ph': 'X', 'pid': os.getpid(), 'tid': hilo,
+                    'ts': 1e6 * (inicio - self.origen), 'dur': 1e6 * duracion}
+                   for nombre, inicio, duracion, hilo in tramos]
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, archivo)
+        return len(eventos)
+
+
+trazador = Trazador()
+trazador.activo = bool(os.environ.get("SENALES_TRAZAS"))
+
+
+def tramo(nombre):
+    return trazador.tramo(nombre)
@@ -0,0 +1,47 @@
+# Cronometraje común a los scripts bench_*.py.
+#
+# mejor_tiempo: mejor de N repeticiones después de una de calentamiento.
+# medir: repite hasta acumular un tiempo mínimo y resume mínimo y mediana
+# (la suite de regresión guarda ese resumen como referencia).
+# cronometrar: una sola llamada con su resultado, su tiempo y la memoria
+# pico que reservó (tracemalloc, que ve las reservas de NumPy).
+
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def mejor_tiempo(funcion, repeticiones):
+    funcion()  # Calentamiento (cachés, planes de FFT, primer dibujo)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def medir(funcion, tiempo_min, repeticiones_min=3, repeticiones_max=200):
+    funcion()  # Calentamiento
+    tiempos = []
+    inicio = time.perf_counter()
+    while (len(tiempos) < repeticiones_min
+           or (time.perf_counter() - inicio < tiempo_min and len(tiempos) < repeticiones_max)):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return {'minimo': min(tiempos), 'mediana': float(np.median(tiempos)),
+            'repeticiones': len(tiempos)}
+
+
+def cronometrar(funcion, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        tiempo = time.perf_counter() - t0
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, tiempo, pico
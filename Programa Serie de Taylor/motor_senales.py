@@ -0,0 +1,364 @@
+# Motor de señales y espectros sin interfaz gráfica.
+#
+# Contiene la síntesis de señales y el cálculo de la Transformada de Fourier
+# que antes vivían dentro de SignalGeneratorApp. Solo depende de NumPy (scipy
+# se usa si está instalado para las transformadas float32), de modo que
+# puede importarse desde scripts por lotes, procesos de trabajo o pruebas sin
+# abrir ninguna ventana ni cargar tkinter/matplotlib.
+#
+# Precisión: todas las etapas aceptan dtype=np.float32 para trabajar en
+# float32/complex64 de punta a punta (la mitad de memoria que float64). La
+# síntesis se hace en float64 por bloques acotados y se convierte al
+# guardar, así que la señal float32 es la float64 redondeada. Con
+# productos= solo se guardan los derivados pedidos (magnitud, fase); real e
+# imag son vistas de la transformada y lo demás se obtiene con derivar() o,
+# para graficar por tramos sin reservar el vector, con producto().
+# Cotas frente a float64 (medidas con bench_precision.py, hasta 10^7
+# muestras):
+#   - base de tiempo: error relativo <= 2^-24 (6e-8).
+#   - seno y triangular: |error| <= 6e-8·amplitud.
+#   - cuadrada: exacta.
+#   - FFT complex64: |error| <= ~1e-7·sum|x| por bin. Los bins más de
+#     ~130 dB por debajo del pico quedan en el ruido y su fase no es fiable.
+
+from functools import lru_cache
+
+import numpy as np
+
+import backend_fft
+from instrumentacion import tramo
+
+TIPOS_SENAL = ("seno", "cuadrada", "triangular")
+PRODUCTOS = ("magnitud", "real", "imag", "fase")
+
+# Elementos por bloque al sintetizar el banco (los intermedios son float64)
+ELEMENTOS_BLOQUE = 1 << 16
+
+
+def base_tiempo(muestras, continua, frecuencia=1, dtype=np.float64):
+    # Devuelve t y el argumento 2π·f·t, en el mismo orden de operaciones que
+    # la versión original para que los flancos de la cuadrada caigan en las
+    # mismas muestras. El argumento siempre se calcula en float64
+    if continua:
+        t = np.linspace(0, 1, muestras)
+        argumento = 2 * np.pi * frecuencia * t
+    else:
+        t = np.arange(muestras, dtype=float)
+        argumento = 2 * np.pi * frecuencia * t / muestras  # Normalizado para discretas
+    return t.astype(dtype, copy=False), argumento
+
+
+def forma_onda(tipo, argumento):
+    # Formas de onda normalizadas (amplitud 1) con las mismas operaciones que
+    # np.sin, scipy.signal.square y scipy.signal.sawtooth(width=0.5), de modo
+    # que el resultado coincide muestra a muestra
+    if tipo == "seno":
+        return np.sin(argumento)
+
+    # Posición dentro del periodo en el intervalo [0, 2π)
+    x = np.mod(argumento, 2 * np.pi)
+    subida = x < np.pi
+    if tipo == "cuadrada":
+        uno = x.dtype.type(1)
+        return np.where(subida, uno, -uno)
+    elif tipo == "triangular":
+        # x/(π/2) - 1 en la primera mitad, (3π/2 - x)/(π/2) en la segunda
+        np.subtract(np.pi * 1.5, x, out=x, where=~subida)
+        x /= np.pi * 0.5
+        np.subtract(x, 1, out=x, where=subida)
+        return x
+    raise ValueError("Tipo de señal no válido")
+
+
+def generar_senal(tipo, frecuencia, muestras, amplitud, continua, dtype=np.float64):
+    if tipo not in TIPOS_SENAL:
+        raise ValueError("Tipo de señal no válido")
+    if np.dtype(dtype) == np.float64:
+        t, argumento = base_tiempo(muestras, continua, frecuencia)
+        senal = forma_onda(tipo, argumento)
+        senal *= amplitud
+        return t, senal
+    t = base_tiempo(muestras, continua, dtype=dtype)[0]
+    senal = generar_banco([{'tipo': tipo, 'frecuencia': frecuencia, 'amplitud': amplitud,
+                            'muestras': muestras, 'continua': continua}], dtype=dtype)[0]
+    return t, senal
+
+
+# beta de Kaiser por defecto: lóbulos laterales parecidos a los de Blackman
+BETA_KAISER = 8.6
+
+VENTANAS = {
+    "rectangular": np.ones,
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+    "kaiser": lambda longitud, beta=BETA_KAISER: np.kaiser(longitud, beta),
+}
+
+
+def crear_ventana(nombre, longitud, beta=None):
+    # beta solo se aplica a la ventana de Kaiser
+    if nombre not in VENTANAS:
+        raise ValueError("Ventana no válida")
+    if nombre == "kaiser" and beta is not None:
+        return VENTANAS[nombre](longitud, beta)
+    return VENTANAS[nombre](longitud)
+
+
+@lru_cache(maxsize=8)
+def eje_frecuencias(muestras, longitud=None, dtype=np.float64):
+    # Eje de frecuencias compartido (solo lectura) entre llamadas del mismo
+    # tamaño; longitud es el tamaño de la transformada si hubo relleno
+    # Mismos valores que np.fft.rfftfreq, calculados en float64 por bloques
+    # y escritos directamente en dtype: sin intermedios int64/float64 del
+    # tamaño completo
+    longitud = muestras if longitud is None else longitud
+    mitad = longitud // 2
+    paso = 1.0 / (longitud * (1.0 / muestras))
+    frecuencias = np.empty(mitad, dtype=dtype)
+    for inicio in range(0, mitad, ELEMENTOS_BLOQUE):
+        fin = min(inicio + ELEMENTOS_BLOQUE, mitad)
+        np.multiply(np.arange(inicio, fin, dtype=float), paso, out=frecuencias[inicio:fin])
+    frecuencias.flags.writeable = False
+    return frecuencias
+
+
+def reservar_espectro(muestras, canales=(), dtype=np.float64, productos=PRODUCTOS):
+    # Búferes reutilizables para los productos que no son vistas de la FFT;
+    # canales es el número de filas (o la forma de los ejes previos).
+    if isinstance(canales, int):
+        canales = (canales,)
+    forma = tuple(canales) + (muestras // 2,)
+    return {clave: np.empty(forma, dtype=dtype) for clave in ('magnitud', 'fase')
+            if clave in productos}
+
+
+def derivar(espectro, clave, out=None):
+    # Calcula a demanda un producto que no se pidió a calcular_espectro; real
+    # e imag siempre están porque son vistas de la transformada
+    if clave not in espectro:
+        if clave == 'magnitud':
+            espectro[clave] = np.hypot(espectro['real'], espectro['imag'], out=out)
+        elif clave == 'fase':
+            espectro[clave] = np.arctan2(espectro['imag'], espectro['real'], out=out)
+        else:
+            raise ValueError("Producto de espectro no válido")
+    return espectro[clave]
+
+
+class ProductoDiferido:
+    # Magnitud o fase que no se pidió a calcular_espectro, calculada al
+    # indexarla a partir de real e imag. decimacion.decimar la recorre por
+    # bloques, de modo que graficarla nunca reserva el vector completo; a
+    # cambio se vuelve a calcular cada vez que se redecima lo visible.
+    por_tramos = True
+
+    def __init__(self, espectro, clave):
+        if clave not in ('magnitud', 'fase'):
+            raise ValueError("Producto de espectro no válido")
+        self.real = espectro['real']
+        self.imag = espectro['imag']
+        self.clave = clave
+        self.shape = self.real.shape
+        self.dtype = self.real.dtype
+
+    def __len__(self):
+        return len(self.real)
+
+    def __getitem__(self, indice):
+        if self.clave == 'magnitud':
+            return np.hypot(self.real[indice], self.imag[indice])
+        return np.arctan2(self.imag[indice], self.real[indice])
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[...], dtype=dtype)
+
+
+def producto(espectro, clave):
+    # El producto guardado o, si no se pidió, uno diferido
+    if clave in espectro or clave not in ('magnitud', 'fase'):
+        return espectro[clave]
+    return ProductoDiferido(espectro, clave)
+
+
+def calcular_espectro(senal, modo="rfft", salida=None, backend=None, productos=PRODUCTOS):
+    # modo "rfft": transformada de entrada real, solo calcula la mitad no
+    # negativa del espectro; real e imag son vistas de la transformada y
+    # magnitud/fase se escriben en una sola pasada sobre búferes (opcionalmente
+    # reservados de antemano con reservar_espectro).
+    # modo "fft": ruta original con la transformada compleja completa.
+    # Con una matriz (canales, muestras) la transformada se hace por filas.
+    # backend: backend_fft.BackendFFT opcional (scipy multihilo, relleno a
+    # tamaños rápidos); sin él se usa np.fft. Si el backend rellena, la salida
+    # reservada debe corresponder a backend.longitud(muestras).
+    # La precisión sigue a la de la señal (float32 -> complex64). productos
+    # limita qué derivados se calculan en la ruta rfft; los demás se obtienen
+    # luego con derivar().
+    if backend is None:
+        backend = backend_fft.backend_predeterminado(senal.dtype)
+    muestras = senal.shape[-1]
+    longitud = muestras if backend is None else backend.longitud(muestras)
+    mitad = longitud // 2
+    if modo == "fft":
+        if backend is None:
+            transformada = np.fft.fft(senal, axis=-1)[..., :mitad]
+        else:
+            transformada = backend.fft(senal, n=longitud)[..., :mitad]
+        return {
+            'frecuencias': np.fft.fftfreq(longitud, d=1.0 / muestras)[:mitad],
+            'magnitud': np.abs(transformada),
+            'real': np.real(transformada),
+            'imag': np.imag(transformada),
+            'fase': np.angle(transformada),
+        }
+    elif modo != "rfft":
+        raise ValueError("Modo de espectro no válido")
+
+    dtype = np.float32 if senal.dtype == np.float32 else np.float64
+    if salida is None:
+        salida = reservar_espectro(longitud, senal.shape[:-1], dtype, productos)
+    if backend is None:
+        transformada = np.fft.rfft(senal, axis=-1)[..., :mitad]
+    else:
+        transformada = backend.rfft(senal, n=longitud)[..., :mitad]
+    espectro = {
+        'frecuencias': eje_frecuencias(muestras, longitud, dtype),
+        'real': transformada.real,
+        'imag': transformada.imag,
+    }
+    if 'magnitud' in productos:
+        espectro['magnitud'] = np.abs(transformada, out=salida['magnitud'])
+    if 'fase' in productos:
+        espectro['fase'] = np.arctan2(espectro['imag'], espectro['real'], out=salida['fase'])
+    return espectro
+
+
+def generar_banco(configuraciones, muestras=None, dtype=np.float64):
+    # Síntesis vectorizada de N canales en una matriz (canales, muestras).
+    # Cada configuración es un diccionario como los de generar_senal; las
+    # entradas None dejan su fila en cero. Las señales más cortas quedan
+    # rellenadas con ceros en la única reserva de la matriz, cuya longitud es
+    # la mayor de las señales o 'muestras' si se indica una mayor. Las
+    # columnas se recorren por bloques para que los intermedios (la fase en
+    # float64) no crezcan con la longitud de la señal.
+    longitudes = [c['muestras'] for c in configuraciones if c is not None]
+    muestras = max(longitudes + [muestras or 0])
+    banco = np.zeros((len(configuraciones), muestras), dtype=dtype)
+
+    for tipo in TIPOS_SENAL:
+        filas = [i for i, c in enumerate(configuraciones)
+                 if c is not None and c['tipo'] == tipo]
+        if not filas:
+            continue
+        grupo = [configuraciones[i] for i in filas]
+        longitud = np.array([c['muestras'] for c in grupo])
+        continua = np.array([c['continua'] for c in grupo])
+        # Mismo orden que base_tiempo: (2π·f)·t, y en las discretas t es el
+        # índice y se divide entre m al final. linspace(0, 1, m) vale
+        # n·(1/(m - 1)) salvo la última muestra, que es 1 exacto
+        angular = 2 * np.pi * np.array([c['frecuencia'] for c in grupo], dtype=float)
+        paso_t = np.where(continua, 1 / np.maximum(longitud - 1, 1), 1.0)
+        divisor = np.where(continua, 1, longitud).astype(float)
+        ultima = np.where(continua & (longitud > 1), longitud - 1, -1)
+        amplitud = np.array([c['amplitud'] for c in grupo], dtype=float)[:, np.newaxis]
+
+        paso = max(ELEMENTOS_BLOQUE // len(filas), 1)
+        for inicio in range(0, muestras, paso):
+            columnas = np.arange(inicio, min(inicio + paso, muestras))
+            argumento = np.multiply.outer(paso_t, columnas)
+            argumento[columnas == ultima[:, np.newaxis]] = 1.0
+            argumento *= angular[:, np.newaxis]
+            argumento /= divisor[:, np.newaxis]
+            bloque = forma_onda(tipo, argumento)
+            bloque *= amplitud
+            bloque[columnas >= longitud[:, np.newaxis]] = 0
+            banco[filas, inicio:inicio + paso] = bloque
+
+    desconocidos = {c['tipo'] for c in configuraciones
+                    if c is not None and c['tipo'] not in TIPOS_SENAL}
+    if desconocidos:
+        raise ValueError("Tipo de señal no válido")
+    return banco
+
+
+def analizar_banco(configuraciones, modo="rfft", token=None, backend=None,
+                   dtype=np.float64, productos=PRODUCTOS):
+    # token: objeto opcional con verificar(), que lanza una excepción si el
+    # trabajo fue cancelado (ver trabajador.TokenCancelacion)
+    if token is not None:
+        token.verificar()
+    with tramo("sintesis"):
+        banco = generar_banco(configuraciones, dtype=dtype)
+    if token is not None:
+        token.verificar()
+    with tramo("fft"):
+        return banco, calcular_espectro(banco, modo, backend=backend, productos=productos)
+
+
+def calcular_canal(parametros, muestras, modo="rfft", dtype=np.float64,
+                   productos=PRODUCTOS, backend=None):
+    # Un solo canal rellenado hasta 'muestras' y su espectro; parametros=None
+    # produce el canal vacío
+    with tramo("sintesis"):
+        senal = generar_banco([parametros], muestras, dtype)[0]
+    with tramo("fft"):
+        return senal, calcular_espectro(senal, modo, backend=backend, productos=productos)
+
+
+def analizar_canales(parametros1, parametros2=None, token=None, cache=None,
+                     dtype=np.float64, productos=PRODUCTOS, backend=None):
+    # parametros: diccionario con tipo, frecuencia, amplitud, muestras, continua.
+    # Devuelve las señales igualadas en longitud y el espectro de cada canal,
+    # listos para que la interfaz (u otro cliente) los grafique. Con una caché
+    # (ver cache_espectros.CacheEspectros) cada canal se busca por separado y
+    # solo se recalculan los que cambiaron.
+    if cache is None:
+        banco, espectro = analizar_banco([parametros1, parametros2], token=token,
+                                         backend=backend, dtype=dtype, productos=productos)
+        canales = [(banco[fila], {clave: valores if clave == 'frecuencias' else valores[fila]
+                                  for clave, valores in espectro.items()})
+                   for fila in range(2)]
+        if token is not None:
+            token.verificar()
+    else:
+        longitud = max(p['muestras'] for p in (parametros1, parametros2) if p is not None)
+        canales = []
+        for parametros in (parametros1, parametros2):
+            if token is not None:
+                token.verificar()
+            canales.append(cache.obtener(parametros, longitud, dtype, productos, backend))
+        if token is not None:
+            token.verificar()
+    muestras = len(canales[0][0])
+
+    return {
+        'muestras': muestras,
+        't_anim': np.arange(muestras, dtype=dtype),
+        'senal1': canales[0][0],
+        'senal2': canales[1][0],
+        'espectro1': canales[0][1],
+        'espectro2': canales[1][1],
+    }
+
+
+def graficar_analisis(resultado, usar_canal2=False):
+    # Vista rápida con matplotlib para uso fuera de la aplicación; la
+    # importación es diferida para no cargar la pila gráfica en lotes.
+    import matplotlib.pyplot as plt
+
+    fig, axs = plt.subplots(3, 1, figsize=(10, 8))
+    canales = [('espectro1', 'senal1', 'CH1')]
+    if usar_canal2:
+        canales.append(('espectro2', 'senal2', 'CH2'))
+    for clave_espectro, clave_senal, etiqueta in canales:
+        espectro = resultado[clave_espectro]
+        axs[0].plot(espectro['frecuencias'], espectro['magnitud'], label=etiqueta)
+        axs[1].plot(espectro['frecuencias'], espectro['fase'], label=etiqueta)
+        axs[2].plot(resultado['t_anim'], resultado[clave_senal], label=etiqueta)
+    axs[0].set_title("Espectro de Fourier (Magnitud)")
+    axs[1].set_title("Fase (radianes)")
+    axs[2].set_title("Señales combinadas (Tiempo)")
+    for ax in axs:
+        ax.legend(loc='upper right')
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,70 @@
+# Modo de osciloscopio con búfer circular precalculado.
+#
+# En lugar de rotar la señal con np.roll en cada cuadro, se guarda una vez la
+# señal duplicada (o su envolvente mín/máx duplicada, cuando hay más muestras
+# que píxeles) y cada cuadro es una rebanada sin copia de ese búfer. El costo
+# por cuadro depende del ancho del lienzo, no del número de muestras.
+
+import time
+from collections import deque
+
+import numpy as np
+
+import decimacion
+
+
+class BufferOsciloscopio:
+    def __init__(self, senales, ancho_px):
+        senales = np.atleast_2d(np.asarray(senales))
+        self.muestras = senales.shape[-1]
+        self.cubeta = decimacion.tam_cubeta(self.muestras, ancho_px)
+
+        # Se añade una cubeta extra para que la última ventana nunca se salga
+        duplicada = np.concatenate([senales, senales, senales[:, :self.cubeta]], axis=-1)
+        if self.cubeta == 1:
+            self.buffer = duplicada
+            self.visibles = self.muestras
+            self.eje_x = np.arange(self.muestras)
+        else:
+            self.buffer = decimacion.envolvente_minmax(duplicada, self.cubeta)
+            cubetas = -(-self.muestras // self.cubeta)
+            self.visibles = 2 * cubetas
+            self.eje_x = decimacion.eje_envolvente(cubetas, self.cubeta)
+
+    def cuadro(self, desplazamiento):
+        # Vista (canales, puntos) de la ventana que empieza en 'desplazamiento'
+        inicio = desplazamiento % self.muestras
+        if self.cubeta > 1:
+            inicio = 2 * (inicio // self.cubeta)
+        return self.buffer[:, inicio:inicio + self.visibles]
+
+
+class MedidorFPS:
+    def __init__(self, ventana=50):
+        self.intervalos = deque(maxlen=ventana)
+        self.duraciones = deque(maxlen=ventana)
+        self.anterior = None
+
+    def registrar(self, duracion):
+        # duracion: tiempo de cálculo del cuadro; el intervalo se mide entre
+        # llamadas sucesivas
+        ahora = time.perf_counter()
+        if self.anterior is not None:
+            self.intervalos.append(ahora - self.anterior)
+        self.anterior = ahora
+        self.duraciones.append(duracion)
+
+    @property
+    def fps(self):
+        if not self.intervalos:
+            return 0.0
+        return len(self.intervalos) / sum(self.intervalos)
+
+    @property
+    def tiempo_cuadro_ms(self):
+        if not self.duraciones:
+            return 0.0
+        return 1e3 * sum(self.duraciones) / len(self.duraciones)
+
+    def texto(self):
+        return "{0:5.1f} FPS | cuadro {1:6.2f} ms".format(self.fps, self.tiempo_cuadro_ms)
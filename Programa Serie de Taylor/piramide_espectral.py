@@ -0,0 +1,193 @@
+# Índice espectral multirresolución para explorar capturas largas.
+#
+# La transformada se calcula una sola vez. Sobre su magnitud se construyen
+# niveles cada vez más gruesos (máximo de cada grupo de 'factor' bins, para
+# no perder picos, como la envolvente de decimacion.py), de modo que una
+# vista de cualquier rango cuesta O(píxeles) y no O(bins). Para ver una
+# banda con más detalle que la resolución nativa fs/N se usa un zoom de
+# banda limitada: los bins de la banda (más un margen) se llevan a banda
+# base con una IFFT corta y se vuelven a transformar con relleno, lo que
+# interpola el espectro dentro de la banda. Ese costo depende solo del ancho
+# de la banda, no de la longitud de la captura. zoom_czt calcula lo mismo de
+# forma exacta desde la señal con la transformada chirp-z (scipy), como
+# referencia, pero su costo sí crece con N.
+#
+# El margen absorbe la fuga de los bins vecinos: con ventana de Hann (la
+# opción por defecto) la fuga cae muy rápido y con 16 bins el zoom coincide
+# con la chirp-z en ~1e-7 del pico; con el espectro rectangular de la
+# aplicación (desde_espectro) se usan 64 bins y la diferencia es ~1e-3.
+# Decimador usa rango() para las líneas de magnitud cuando el rango visible
+# tiene menos bins que píxeles.
+
+import numpy as np
+
+import backend_fft
+import motor_senales
+
+# Interpolación máxima entre bins del zoom (acota la FFT de bandas diminutas)
+RELLENO_MAXIMO = 1 << 12
+
+
+class PiramideEspectral:
+    def __init__(self, transformada, frecuencias, escala=1.0, factor=4, margen=16,
+                 longitud=None, nyquist=None):
+        # transformada: mitad no negativa compleja (como la de
+        # calcular_espectro); escala pasa de |X| a las unidades mostradas
+        self.transformada = transformada
+        self.frecuencias = np.asarray(frecuencias)
+        self.paso = (self.frecuencias[1] - self.frecuencias[0]
+                     if len(self.frecuencias) > 1 else 1.0)
+        self.escala = escala
+        self.factor = factor
+        self.margen = margen
+        # Largo de la DFT completa (por defecto par) y su bin longitud//2
+        # (Nyquist si es par), que la mitad guardada no incluye; sirven para
+        # extender la banda del zoom más allá de los bordes
+        self.longitud = 2 * self.frecuencias.shape[-1] if longitud is None else longitud
+        self.nyquist = nyquist
+
+        base = np.abs(transformada)
+        if escala != 1.0:
+            base *= escala
+        self.niveles = [base]
+        while self.niveles[-1].shape[-1] > factor:
+            anterior = self.niveles[-1]
+            grupos = anterior.shape[-1] // factor
+            recortado = anterior[..., :grupos * factor]
+            self.niveles.append(recortado.reshape(anterior.shape[:-1] + (grupos, factor))
+                                .max(axis=-1))
+
+    @classmethod
+    def desde_senal(cls, senal, frecuencia_muestreo=None, ventana="hann", backend=None,
+                    factor=4, margen=16):
+        # Ventana + rfft una sola vez; la magnitud queda en amplitud de pico
+        senal = np.asarray(senal)
+        if senal.dtype != np.float32:
+            senal = senal.astype(float, copy=False)
+        muestras = senal.shape[-1]
+        coeficientes = motor_senales.crear_ventana(ventana, muestras).astype(senal.dtype)
+        ponderada = senal * coeficientes
+        if backend is None:
+            backend = backend_fft.backend_predeterminado(ponderada.dtype)
+        if backend is None:
+            transformada = np.fft.rfft(ponderada, axis=-1)
+        else:
+            transformada = backend.rfft(ponderada, n=muestras)
+        frecuencias = motor_senales.eje_frecuencias(muestras)
+        if frecuencia_muestreo is not None:
+            frecuencias = frecuencias * (frecuencia_muestreo / muestras)
+        nyquist = transformada[..., muestras // 2]
+        return cls(transformada[..., :muestras // 2], frecuencias, 2 / coeficientes.sum(),
+                   factor, margen, muestras, nyquist)
+
+    @classmethod
+    def desde_espectro(cls, espectro, factor=4, margen=64):
+        # Reutiliza un resultado de calcular_espectro (real e imag son vistas
+        # de la transformada): no se calcula ninguna FFT nueva
+        real = espectro['real']
+        transformada = np.empty(real.shape, dtype=np.result_type(real.dtype, np.complex64))
+        transformada.real = real
+        transformada.imag = espectro['imag']
+        return cls(transformada, espectro['frecuencias'], 1.0, factor, margen)
+
+    def indices(self, f0, f1):
+        bins = len(self.frecuencias)
+        origen = self.frecuencias[0]
+        k0 = 0 if f0 is None else int(np.clip(np.floor((f0 - origen) / self.paso), 0, bins))
+        k1 = bins if f1 is None else int(np.clip(np.ceil((f1 - origen) / self.paso) + 1, 0, bins))
+        return k0, max(k1, k0)
+
+    def vista(self, f0=None, f1=None, ancho_px=1000):
+        # (x, y) del rango con unos ancho_px puntos, desde el nivel más grueso
+        # que todavía tenga al menos esa cantidad de grupos en el rango
+        k0, k1 = self.indices(f0, f1)
+        nivel = 0
+        while (nivel + 1 < len(self.niveles)
+               and (k1 - k0) // self.factor ** (nivel + 1) >= ancho_px):
+            nivel += 1
+        tamano = self.factor ** nivel
+        g0, g1 = k0 // tamano, -(-k1 // tamano)
+        y = self.niveles[nivel][..., g0:g1]
+        centros = (np.arange(g0, g0 + y.shape[-1]) * tamano + (tamano - 1) / 2)
+        return self.frecuencias[0] + centros * self.paso, y
+
+    def zoom(self, f0, f1, puntos=1000):
+        # Espectro interpolado en [f0, f1] con al menos 'puntos' valores,
+        # calculado solo con los bins de la banda
+        k0, k1 = self.indices(f0, f1)
+        b0 = k0 - self.margen
+        b1 = k1 + self.margen
+        longitud = b1 - b0
+        if f0 is None or f1 is None:
+            ancho_bins = max(k1 - k0, 1)
+        else:
+            ancho_bins = max((f1 - f0) / self.paso, 1e-9)
+        relleno = int(np.clip(np.ceil(puntos / ancho_bins), 1, RELLENO_MAXIMO))
+        # Banda base: IFFT corta de los bins de la banda; su FFT rellenada
+        # devuelve exactamente esos bins en las posiciones múltiplos de
+        # 'relleno' e interpola entre ellos
+        banda_base = np.fft.ifft(self.banda(b0, b1), axis=-1)
+        fino = np.fft.fft(banda_base, n=longitud * relleno, axis=-1)
+        posiciones = np.arange(longitud * relleno) / relleno
+        frecuencias = self.frecuencias[0] + (b0 + posiciones) * self.paso
+        dentro = (frecuencias >= (f0 if f0 is not None else -np.inf)) & \
+                 (frecuencias <= (f1 if f1 is not None else np.inf))
+        complejo = fino[..., dentro]
+        magnitud = np.abs(complejo)
+        if self.escala != 1.0:
+            magnitud *= self.escala
+        return {
+            'frecuencias': frecuencias[dentro],
+            'complejo': complejo,
+            'magnitud': magnitud,
+        }
+
+    def banda(self, b0, b1):
+        # Bins b0..b1-1 de la DFT completa, también fuera de la mitad
+        # guardada, para que la interpolación circular del zoom no mezcle un
+        # extremo del espectro con el otro. La DFT es periódica y, para una
+        # señal real, X[L - k] = conj(X[k]); el bin L//2, si no se conoce
+        # (sin nyquist=), queda en cero
+        bins = len(self.frecuencias)
+        if b0 >= 0 and b1 <= bins:
+            return self.transformada[..., b0:b1]
+        restos = np.arange(b0, b1) % self.longitud
+        espejo = self.longitud - restos
+        directos = restos < bins
+        reflejados = ~directos & (espejo < bins)
+        banda = np.zeros(self.transformada.shape[:-1] + (b1 - b0,),
+                         dtype=self.transformada.dtype)
+        banda[..., directos] = self.transformada[..., restos[directos]]
+        banda[..., reflejados] = np.conj(self.transformada[..., espejo[reflejados]])
+        if self.nyquist is not None:
+            banda[..., restos == bins] = self.nyquist[..., np.newaxis]
+            banda[..., espejo == bins] = np.conj(self.nyquist)[..., np.newaxis]
+        return banda
+
+    def rango(self, f0, f1, ancho_px):
+        # Consulta única para las gráficas: vista de la pirámide mientras haya
+        # al menos un bin por píxel; por debajo, zoom de banda limitada
+        k0, k1 = self.indices(f0, f1)
+        if k1 - k0 >= ancho_px:
+            return self.vista(f0, f1, ancho_px)
+        resultado = self.zoom(f0, f1, int(ancho_px))
+        return resultado['frecuencias'], resultado['magnitud']
+
+
+def zoom_czt(senal, f0, f1, puntos=1000, frecuencia_muestreo=None, ventana="hann"):
+    # Referencia exacta: transformada chirp-z de toda la señal sobre [f0, f1]
+    # (O(N log N)). Sin frecuencia_muestreo las frecuencias son ciclos por
+    # señal, como en motor_senales.
+    from scipy.signal import zoom_fft
+
+    senal = np.asarray(senal, dtype=float)
+    muestras = senal.shape[-1]
+    coeficientes = motor_senales.crear_ventana(ventana, muestras)
+    muestreo = muestras if frecuencia_muestreo is None else frecuencia_muestreo
+    valores = zoom_fft(senal * coeficientes, [f0, f1], m=puntos, fs=muestreo, endpoint=True,
+                       axis=-1)
+    return {
+        'frecuencias': np.linspace(f0, f1, puntos),
+        'complejo': valores,
+        'magnitud': np.abs(valores) * (2 / coeficientes.sum()),
+    }
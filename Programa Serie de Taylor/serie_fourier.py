@@ -0,0 +1,130 @@
+# Coeficientes exactos de la serie trigonométrica de Fourier.
+#
+# Para las formas de onda de motor_senales los armónicos se conocen en forma
+# cerrada (igual que getCoefficients en "Serie Trigonométrica de
+# Fourier/main.js"), así que no hace falta muestrear y transformar para
+# conocer su espectro. Convención:
+#
+#     f(x) = a0 / 2 + sum_n an[n-1] cos(n x) + bn[n-1] sin(n x)
+#
+# con x = 2π·frecuencia·t. Las fases coinciden con las del generador de
+# Python: la cuadrada vale +1 en [0, π) y la triangular (sawtooth con
+# width=0.5) empieza en -1, por eso es una serie de cosenos negativa.
+
+import numpy as np
+
+import motor_senales
+
+# THD de la serie completa: sqrt(potencia de armónicos superiores / fundamental)
+THD_EXACTA = {
+    "seno": 0.0,
+    "cuadrada": np.sqrt(np.pi ** 2 / 8 - 1),
+    "triangular": np.sqrt(np.pi ** 4 / 96 - 1),
+}
+
+
+def coeficientes(tipo, n_terminos, amplitud=1.0):
+    n = np.arange(1, n_terminos + 1)
+    an = np.zeros(n_terminos)
+    bn = np.zeros(n_terminos)
+    impares = n % 2 == 1
+    if tipo == "seno":
+        bn[:1] = 1.0
+    elif tipo == "cuadrada":
+        bn[impares] = 4 / (np.pi * n[impares])
+    elif tipo == "triangular":
+        an[impares] = -8 / (np.pi ** 2 * n[impares] ** 2)
+    else:
+        raise ValueError("Tipo de señal no válido")
+    return 0.0, amplitud * an, amplitud * bn
+
+
+def evaluar_serie(a0, an, bn, argumento, tam_bloque=65536):
+    # Suma parcial como producto matricial (armónicos × tiempo). Solo entran
+    # los armónicos con coeficiente no nulo y el tiempo se recorre por
+    # bloques para acotar la matriz intermedia.
+    argumento = np.asarray(argumento, dtype=float)
+    n = np.arange(1, len(an) + 1)
+    usados_cos = np.flatnonzero(an)
+    usados_sin = np.flatnonzero(bn)
+    resultado = np.full(argumento.shape, a0 / 2)
+    plano = argumento.reshape(-1)
+    salida = resultado.reshape(-1)
+    for inicio in range(0, plano.size, tam_bloque):
+        x = plano[inicio:inicio + tam_bloque]
+        bloque = salida[inicio:inicio + tam_bloque]
+        if usados_cos.size:
+            bloque += an[usados_cos] @ np.cos(np.multiply.outer(n[usados_cos], x))
+        if usados_sin.size:
+            bloque += bn[usados_sin] @ np.sin(np.multiply.outer(n[usados_sin], x))
+    return resultado
+
+
+def suma_parcial(tipo, n_terminos, frecuencia, muestras, amplitud, continua):
+    # Misma base de tiempo que motor_senales.generar_senal
+    t, argumento = motor_senales.base_tiempo(muestras, continua, frecuencia)
+    a0, an, bn = coeficientes(tipo, n_terminos, amplitud)
+    return t, evaluar_serie(a0, an, bn, argumento)
+
+
+def espectro_analitico(tipo, frecuencia, amplitud, n_terminos):
+    # Espectro de líneas: frecuencia, amplitud y fase (convención seno) de
+    # cada armónico no nulo
+    a0, an, bn = coeficientes(tipo, n_terminos, amplitud)
+    n = np.arange(1, n_terminos + 1)
+    amplitudes = np.hypot(an, bn)
+    presentes = amplitudes > 0
+    return {
+        'armonicos': n[presentes],
+        'frecuencias': frecuencia * n[presentes],
+        'amplitudes': amplitudes[presentes],
+        'fases': np.arctan2(an[presentes], bn[presentes]),
+    }
+
+
+def terminos_nyquist(frecuencia, muestras):
+    # Armónicos que caen por debajo de Nyquist (mitad de las muestras); nunca
+    # más de 'mitad', porque los de orden mayor se descartan de todos modos
+    if frecuencia <= 0:
+        raise ValueError("La frecuencia debe ser positiva")
+    mitad = muestras // 2
+    return max(min(int(mitad / frecuencia), mitad), 1)
+
+
+def espectro_dft(parametros, n_terminos=None):
+    # Predicción de la magnitud de la DFT (mitad no negativa, como la de
+    # motor_senales.calcular_espectro) sin calcular ninguna FFT: cada armónico
+    # por debajo de Nyquist aporta N/2·amplitud·|D_N(k - f)| en su bin más
+    # cercano k, con D_N el núcleo de Dirichlet (1 si f es entero). Es exacta
+    # cuando la señal contiene un número entero de periodos y no hay
+    # solapamiento; para frecuencias no enteras sirve de referencia (falta la
+    # fuga hacia los demás bins). En la base continua (linspace con N-1
+    # intervalos) el armónico de frecuencia f cae en f·N/(N-1).
+    muestras = parametros['muestras']
+    mitad = muestras // 2
+    paso = muestras / max(muestras - 1, 1) if parametros['continua'] else 1.0
+    if n_terminos is None:
+        n_terminos = terminos_nyquist(parametros['frecuencia'], muestras)
+    lineas = espectro_analitico(parametros['tipo'], parametros['frecuencia'],
+                                parametros['amplitud'], n_terminos)
+    posiciones = lineas['frecuencias'] * paso
+    bins = np.rint(posiciones).astype(int)
+    validos = (bins > 0) & (bins < mitad)
+    desvio = bins - posiciones
+    dirichlet = np.abs(np.sinc(desvio) / np.sinc(desvio / muestras))
+    magnitud = np.zeros(mitad)
+    np.add.at(magnitud, bins[validos],
+              muestras / 2 * lineas['amplitudes'][validos] * dirichlet[validos])
+    return {
+        'frecuencias': motor_senales.eje_frecuencias(muestras),
+        'magnitud': magnitud,
+    }
+
+
+def thd(tipo, n_terminos=None):
+    # Distorsión armónica total; con n_terminos solo se cuentan esos armónicos
+    if n_terminos is None:
+        return THD_EXACTA[tipo]
+    _, an, bn = coeficientes(tipo, n_terminos)
+    potencia = an ** 2 + bn ** 2
+    return np.sqrt(potencia[1:].sum() / potencia[0])
@@ -0,0 +1,102 @@
+# Ejecución en segundo plano de los cálculos de la interfaz.
+#
+# Los trabajos se envían a un ThreadPoolExecutor (NumPy libera el GIL durante
+# la síntesis y la FFT) y sus resultados vuelven al hilo de Tk mediante
+# root.after, porque Tk no admite llamadas desde otros hilos. Solo cuenta el
+# último trabajo enviado: al enviar uno nuevo se cancela el anterior (si aún
+# espera en la cola ni siquiera empieza) y su resultado, si llega, se
+# descarta.
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrabajoCancelado(Exception):
+    pass
+
+
+class TokenCancelacion:
+    def __init__(self):
+        self.evento = threading.Event()
+
+    def cancelar(self):
+        self.evento.set()
+
+    @property
+    def cancelado(self):
+        return self.evento.is_set()
+
+    def verificar(self):
+        # Los cálculos largos lo llaman entre etapas para abandonar pronto
+        if self.evento.is_set():
+            raise TrabajoCancelado()
+
+
+class TrabajadorCalculo:
+    def __init__(self, root, hilos=1, intervalo_ms=15):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.ejecutor = ThreadPoolExecutor(max_workers=hilos)
+        self.terminados = queue.Queue()
+        self.generacion = 0
+        self.token = None
+        self.futuro = None
+        self.pendientes = 0
+        self.sondeo = None
+
+    @property
+    def ocupado(self):
+        return self.pendientes > 0
+
+    def enviar(self, funcion, al_terminar, al_fallar=None, *args, **kwargs):
+        # funcion recibe token=TokenCancelacion además de sus argumentos
+        self.cancelar()
+        generacion = self.generacion
+        self.token = TokenCancelacion()
+        futuro = self.ejecutor.submit(funcion, *args, token=self.token, **kwargs)
+        self.futuro = futuro
+        self.pendientes += 1
+        futuro.add_done_callback(
+            lambda f: self.terminados.put((generacion, f, al_terminar, al_fallar)))
+        if self.sondeo is None:
+            self.sondeo = self.root.after(self.intervalo_ms, self.sondear)
+
+    def sondear(self):
+        self.sondeo = None
+        while True:
+            try:
+                generacion, futuro, al_terminar, al_fallar = self.terminados.get_nowait()
+            except queue.Empty:
+                break
+            self.pendientes -= 1
+            if generacion != self.generacion:
+                continue  # Trabajo obsoleto: ya hay uno más reciente
+            try:
+                resultado = futuro.result()
+            except TrabajoCancelado:
+                continue
+            except Exception as e:
+                if al_fallar is not None:
+                    al_fallar(e)
+                continue
+            al_terminar(resultado)
+        if self.pendientes > 0:
+            self.sondeo = self.root.after(self.intervalo_ms, self.sondear)
+
+    def cancelar(self):
+        # Cancela el último trabajo: si no empezó se retira de la cola; si
+        # está en curso se detiene en la siguiente verificación y su
+        # resultado se descartará al llegar
+        if self.futuro is not None:
+            self.futuro.cancel()
+        if self.token is not None:
+            self.token.cancelar()
+        self.generacion += 1
+
+    def cerrar(self):
+        self.cancelar()
+        if self.sondeo is not None:
+            self.root.after_cancel(self.sondeo)
+            self.sondeo = None
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)